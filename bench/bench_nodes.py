@@ -0,0 +1,66 @@
+"""
+Micro-benchmark for node allocation.
+
+Compares the __slots__ node classes against dict-backed equivalents, and
+validated ParentNode construction against ParentNode.trusted, on a large
+synthetic document.
+
+    python3 bench/bench_nodes.py [paragraphs]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from htmlnode import LeafNode, ParentNode, markdown_to_html_node
+from textnode import TextNode, TextType
+
+# Subclasses without __slots__ get a per-instance __dict__ again
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+class DictParentNode(ParentNode):
+    pass
+
+def build_tree(leaf_cls, make_parent, paragraphs):
+    blocks = []
+    for i in range(paragraphs):
+        children = [leaf_cls(None, "Some text "), leaf_cls("b", "bold"), leaf_cls("a", "link", {"href": "/x"})]
+        blocks.append(make_parent("p", children))
+    return make_parent("div", blocks)
+
+def build_textnodes(text_cls, paragraphs):
+    return [text_cls("Some text ", TextType.TEXT) for _ in range(paragraphs * 3)]
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms {current / 1e6:9.2f} MB")
+    return result
+
+def main():
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{paragraphs} paragraphs, {paragraphs * 4 + 1} HTML nodes")
+    measure("TextNode (dict)", lambda: build_textnodes(DictTextNode, paragraphs))
+    measure("TextNode (slots)", lambda: build_textnodes(TextNode, paragraphs))
+    measure("HTML tree (dict, validated)", lambda: build_tree(DictLeafNode, DictParentNode, paragraphs))
+    measure("HTML tree (slots, validated)", lambda: build_tree(LeafNode, ParentNode, paragraphs))
+    measure("HTML tree (slots, trusted)", lambda: build_tree(LeafNode, ParentNode.trusted, paragraphs))
+
+    markdown = "\n\n".join(
+        f"Paragraph {i} with **bold**, _italic_ and a [link](/page/{i})" for i in range(paragraphs // 10)
+    )
+    node = measure("markdown_to_html_node", lambda: markdown_to_html_node(markdown))
+    measure("to_html", node.to_html)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Deterministic synthetic site generator for benchmarks.
+
+Builds a content tree with a mix of page kinds (long paragraphs, large code
+blocks, link-heavy and image-heavy pages) spread over nested sections, plus a
+static directory and a template, so the same arguments always produce the
+same corpus.
+
+    python3 bench/corpus.py DIR [--pages N] [--depth D] [--seed S]
+"""
+import argparse
+import os
+import random
+import shutil
+
+WORDS = (
+    "elf hobbit ring shire wizard mountain river forest tower kingdom song "
+    "shadow light journey council sword bow horse road fellowship dragon "
+    "gold map lore age star valley gate bridge fire stone"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+def sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def inline_paragraph(rng, sentences):
+    parts = []
+    for i in range(sentences):
+        text = sentence(rng)
+        match i % 5:
+            case 1:
+                words = text.split(" ")
+                words[1] = f"**{words[1]}**"
+                text = " ".join(words)
+            case 2:
+                text += f" _{rng.choice(WORDS)}_"
+            case 3:
+                text += f" `{rng.choice(WORDS)}()`"
+        parts.append(text)
+    return " ".join(parts)
+
+def long_paragraphs_page(rng, title):
+    blocks = [f"# {title}"]
+    for _ in range(8):
+        blocks.append(inline_paragraph(rng, 40))
+    return blocks
+
+def code_page(rng, title):
+    blocks = [f"# {title}", inline_paragraph(rng, 3)]
+    for _ in range(4):
+        lines = [f"    func_{rng.randrange(1000)}({rng.choice(WORDS)}, {rng.choice(WORDS)})" for _ in range(200)]
+        blocks.append("```\n" + "\n".join(lines) + "\n```")
+    return blocks
+
+def link_page(rng, title, targets):
+    blocks = [f"# {title}", inline_paragraph(rng, 2)]
+    for _ in range(5):
+        items = [f"- [{sentence(rng, 4)}]({rng.choice(targets)})" for _ in range(40)]
+        blocks.append("\n".join(items))
+        blocks.append(" ".join(f"See [{rng.choice(WORDS)}]({rng.choice(targets)})." for _ in range(30)))
+    return blocks
+
+def image_page(rng, title, images):
+    blocks = [f"# {title}"]
+    for _ in range(30):
+        blocks.append(f"![{sentence(rng, 3)}]({rng.choice(images)})")
+        blocks.append(inline_paragraph(rng, 2))
+    return blocks
+
+def mixed_page(rng, title, targets):
+    blocks = [f"# {title}", "## Overview", inline_paragraph(rng, 6)]
+    blocks.append("> " + sentence(rng) + "\n>\n> -- " + rng.choice(WORDS))
+    blocks.append("\n".join(f"{i}. {sentence(rng, 5)}" for i in range(1, 11)))
+    blocks.append(f"Read [more]({rng.choice(targets)}).")
+    return blocks
+
+def page_path(index, depth, fanout=8):
+    # Spread pages over nested sections: s3/s1/s6/page-123.md
+    parts = []
+    n = index
+    for _ in range(depth):
+        parts.append(f"s{n % fanout}")
+        n //= fanout
+    return os.path.join(*parts, f"page-{index}.md")
+
+def generate_corpus(root, pages=1000, depth=3, seed=0):
+    """
+    Writes content/, static/ and template.html under root. Returns a dict
+    describing the corpus.
+    """
+    rng = random.Random(seed)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+    os.makedirs(os.path.join(static_dir, "images"))
+    with open(os.path.join(root, "template.html"), 'w') as f:
+        f.write(TEMPLATE)
+    with open(os.path.join(static_dir, "index.css"), 'w') as f:
+        f.write("body { font-family: serif; }\n" * 50)
+    images = []
+    for i in range(20):
+        name = f"images/img-{i}.png"
+        with open(os.path.join(static_dir, name), 'wb') as f:
+            f.write(rng.randbytes(4096))
+        images.append("/" + name)
+
+    paths = [page_path(i, depth) for i in range(pages)]
+    targets = ["/" + path[:-3] for path in paths] + ["https://example.com/"]
+    total_bytes = 0
+    for i, path in enumerate(paths):
+        title = f"Page {i}: {sentence(rng, 4)}"
+        match i % 5:
+            case 0:
+                blocks = long_paragraphs_page(rng, title)
+            case 1:
+                blocks = code_page(rng, title)
+            case 2:
+                blocks = link_page(rng, title, targets)
+            case 3:
+                blocks = image_page(rng, title, images)
+            case _:
+                blocks = mixed_page(rng, title, targets)
+        markdown = "\n\n".join(blocks) + "\n"
+        full_path = os.path.join(content_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(markdown)
+        total_bytes += len(markdown.encode())
+    return {"root": root, "pages": pages, "depth": depth, "seed": seed, "bytes": total_bytes}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark site")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    info = generate_corpus(args.root, args.pages, args.depth, args.seed)
+    print(f"Wrote {info['pages']} pages ({info['bytes'] / 1e6:.1f} MB) to {info['root']}")
+
+if __name__ == "__main__":
+    main()
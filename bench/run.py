@@ -0,0 +1,191 @@
+"""
+Throughput benchmarks for the site generator.
+
+Each case runs in a fresh subprocess so its peak RSS is measured on its own,
+and is repeated to take the best time. Results are written as JSON and can be
+compared against an earlier run to catch regressions in the hot path.
+
+    python3 bench/run.py [--pages N] [--repeat R] [--output results.json]
+                         [--compare baseline.json] [--threshold 0.1]
+
+Cases: inline (text_to_textnodes), parse (markdown_to_html_node), to_html,
+generate_page, build (end-to-end main()) and build_jobs (main() with -j 0).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+CASES = ("inline", "parse", "to_html", "generate_page", "build", "build_jobs")
+
+def load_sources(corpus):
+    sources = []
+    content_dir = os.path.join(corpus, "content")
+    for root, dirs, files in os.walk(content_dir):
+        for file_name in sorted(files):
+            path = os.path.join(root, file_name)
+            with open(path, 'r') as f:
+                sources.append((path, f.read()))
+    return sources
+
+def run_case(case, corpus):
+    """
+    Runs one case in this process and returns its measurements.
+    """
+    import logging
+    from htmlnode import markdown_to_html_node
+    from md_to_textnode import scan_blocks, text_to_textnodes
+    from textnode import BlockType
+    import main as site
+
+    logging.basicConfig(level=logging.WARNING)
+    sources = load_sources(corpus)
+    pages = len(sources)
+    total_bytes = sum(len(markdown.encode()) for _, markdown in sources)
+    template_path = os.path.join(corpus, "template.html")
+
+    if case == "inline":
+        paragraphs = [block.text for _, markdown in sources for block in scan_blocks(markdown)
+                      if block.type == BlockType.PARAGRAPH]
+        total_bytes = sum(len(paragraph.encode()) for paragraph in paragraphs)
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            text_to_textnodes(paragraph)
+        elapsed = time.perf_counter() - start
+    elif case == "parse":
+        start = time.perf_counter()
+        for _, markdown in sources:
+            markdown_to_html_node(markdown)
+        elapsed = time.perf_counter() - start
+    elif case == "to_html":
+        trees = [markdown_to_html_node(markdown) for _, markdown in sources]
+        start = time.perf_counter()
+        for tree in trees:
+            tree.to_html()
+        elapsed = time.perf_counter() - start
+    elif case == "generate_page":
+        with tempfile.TemporaryDirectory() as out:
+            start = time.perf_counter()
+            for i, (path, _) in enumerate(sources):
+                site.generate_page(path, template_path, os.path.join(out, f"{i}.html"))
+            elapsed = time.perf_counter() - start
+    elif case in ("build", "build_jobs"):
+        with tempfile.TemporaryDirectory() as out:
+            argv = [
+                "--content", os.path.join(corpus, "content"),
+                "--static", os.path.join(corpus, "static"),
+                "--template", template_path,
+                "--output", os.path.join(out, "docs"),
+            ]
+            if case == "build_jobs":
+                argv += ["--jobs", "0"]
+            start = time.perf_counter()
+            site.main(argv)
+            elapsed = time.perf_counter() - start
+    else:
+        raise ValueError(f"Unknown benchmark case: {case}")
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "case": case,
+        "seconds": elapsed,
+        "pages": pages,
+        "bytes": total_bytes,
+        "pages_per_sec": pages / elapsed if elapsed else 0,
+        "mb_per_sec": total_bytes / 1e6 / elapsed if elapsed else 0,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": max(usage, children) / 1024,
+    }
+
+def run_isolated(case, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, "--case", case, "--corpus", corpus],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+def compare(results, baseline_path, threshold):
+    """
+    Prints the change against a previous results file and returns the cases
+    that got slower by more than threshold.
+    """
+    with open(baseline_path, 'r') as f:
+        baseline = {result["case"]: result for result in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get(result["case"])
+        if old is None:
+            continue
+        change = result["seconds"] / old["seconds"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"  {result['case']:<14} {change * 100:+7.1f}%{flag}")
+        if change > threshold:
+            regressions.append(result["case"])
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated cases to run")
+    parser.add_argument("--corpus", help="existing corpus directory to reuse")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", metavar="PATH", help="results JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown ratio reported as a regression by --compare")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Child process: run a single case and report it on stdout
+        print(json.dumps(run_case(args.case, args.corpus)))
+        return
+
+    from corpus import generate_corpus
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = os.path.join(tmp, "corpus")
+            generate_corpus(corpus, args.pages, args.depth, args.seed)
+        results = []
+        print(f"{'case':<14} {'seconds':>9} {'pages/s':>10} {'MB/s':>8} {'peak RSS':>10}")
+        for case in args.cases.split(","):
+            result = run_isolated(case, corpus, args.repeat)
+            results.append(result)
+            print(f"{case:<14} {result['seconds']:9.3f} {result['pages_per_sec']:10.1f} "
+                  f"{result['mb_per_sec']:8.2f} {result['peak_rss_mb']:8.1f}MB")
+
+    report = {
+        "pages": args.pages,
+        "depth": args.depth,
+        "seed": args.seed,
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        print(f"Compared with {args.compare}:")
+        if compare(results, args.compare, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
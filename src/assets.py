@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+import logging
+from manifest import file_hash, remove_output, write_if_changed
+
+logger = logging.getLogger("ssg")
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# ioctl request for a copy-on-write clone of a whole file (Linux FICLONE)
+FICLONE = 0x40049409
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, 'rb') as src_f, open(dst, 'wb') as dst_f:
+        try:
+            fcntl.ioctl(dst_f.fileno(), FICLONE, src_f.fileno())
+        except OSError:
+            dst_f.close()
+            os.remove(dst)
+            raise
+    shutil.copystat(src, dst)
+
+def place_file(src, dst, link_mode="auto", hardlink=True):
+    """
+    Puts a copy of src at dst, replacing whatever is there, and returns the
+    method used. "auto" tries a copy-on-write reflink, then a hardlink, then
+    falls back to a regular copy. With hardlink False the file is never
+    hardlinked, whatever the mode: "hardlink" then acts like "auto" without
+    its hardlink step.
+    """
+    if not hardlink and link_mode == "hardlink":
+        link_mode = "auto"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    # Never write through an existing file, it may be hardlinked to a source
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if link_mode in ("auto", "reflink"):
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except (OSError, ImportError):
+            if link_mode == "reflink":
+                raise
+    if hardlink and link_mode in ("auto", "hardlink"):
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            if link_mode == "hardlink":
+                raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+def sync_directory(src, dst, manifest, link_mode="auto"):
+    """
+    Copies only the files of src that changed since the last build and
+    deletes outputs whose sources were removed. dst is never wiped.
+    
+    Files whose size and mtime match the manifest are skipped without being
+    read; otherwise the content hash decides whether they are placed again.
+    """
+    os.makedirs(dst, exist_ok=True)
+    seen = set()
+    copied = 0
+    for root, dirs, files in os.walk(src):
+        relative_path = os.path.relpath(root, src)
+        for file_name in files:
+            src_file = os.path.join(root, file_name)
+            rel_file = os.path.normpath(os.path.join(relative_path, file_name))
+            seen.add(rel_file)
+            stat = os.stat(src_file)
+            if manifest.stat_matches("static", rel_file, stat, rel_file, dst):
+                continue
+            content_hash = file_hash(src_file)
+            if not manifest.is_fresh("static", rel_file, content_hash, rel_file, dst):
+                dst_file = os.path.join(dst, rel_file)
+                method = place_file(src_file, dst_file, link_mode)
+                logger.debug("Copying file (%s): %s -> %s", method, src_file, dst_file)
+                copied += 1
+            manifest.record("static", rel_file, content_hash, rel_file, stat)
+    removed = manifest.prune("static", seen, dst)
+    logger.info("Static files: %d copied, %d unchanged, %d removed", copied, len(seen) - copied, len(removed))
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 10
+
+def fingerprinted_name(rel_path, content_hash):
+    """
+    Inserts a content hash before the extension: css/index.css ->
+    css/index.1a2b3c4d5e.css
+    """
+    directory, file_name = os.path.split(rel_path)
+    stem, ext = os.path.splitext(file_name)
+    return os.path.join(directory, f"{stem}.{content_hash[:FINGERPRINT_LENGTH]}{ext}")
+
+def fingerprint_assets(src, dst, link_mode="auto", manifest=None):
+    """
+    Places a content-hashed copy of every file in src next to its plain copy
+    in dst and writes asset-manifest.json mapping plain to hashed names.
+    Returns the URL map ({"/index.css": "/index.<hash>.css"}) used to rewrite
+    references in generated pages.
+
+    Hashed copies are reflinked or copied, never hardlinked, in every link
+    mode: editing the source in place would change the content behind a
+    name caches treat as immutable.
+
+    With a build manifest, hashed copies replaced by this run are kept for
+    one more build, so pages cached with the old names still load their
+    assets, and hashes already recorded in it are reused. Without one they
+    are deleted straight away.
+    """
+    os.makedirs(dst, exist_ok=True)
+    manifest_path = os.path.join(dst, ASSET_MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    
+    mapping = {}
+    placed = 0
+    for root, dirs, files in os.walk(src):
+        relative_path = os.path.relpath(root, src)
+        for file_name in files:
+            src_file = os.path.join(root, file_name)
+            rel_file = os.path.normpath(os.path.join(relative_path, file_name))
+            entry = manifest.static.get(rel_file) if manifest is not None else None
+            content_hash = entry["hash"] if entry else file_hash(src_file)
+            hashed = fingerprinted_name(rel_file, content_hash)
+            mapping[rel_file.replace(os.sep, "/")] = hashed.replace(os.sep, "/")
+            dst_file = os.path.join(dst, hashed)
+            # The name changes with the content, so an existing file is current
+            if not os.path.exists(dst_file):
+                place_file(src_file, dst_file, link_mode, hardlink=False)
+                placed += 1
+    
+    live = set(mapping.values())
+    retired = sorted({hashed for hashed in previous.values() if hashed not in live})
+    stale = retired
+    if manifest is not None:
+        stale = [hashed for hashed in manifest.retired if hashed not in live and hashed not in retired]
+        manifest.retired = retired
+    for hashed in stale:
+        remove_output(os.path.join(dst, hashed), dst)
+    
+    write_if_changed(manifest_path, json.dumps(mapping, indent=1, sort_keys=True))
+    logger.info("Fingerprinted assets: %d placed, %d unchanged", placed, len(mapping) - placed)
+    return {"/" + name: "/" + hashed for name, hashed in mapping.items()}
@@ -0,0 +1,84 @@
+import gzip
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("ssg")
+
+TEXT_EXTENSIONS = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map")
+COMPRESSED_EXTENSIONS = (".gz", ".br")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+def _encoders():
+    encoders = {".gz": lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encoders[".br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    return encoders
+
+def _is_current(path, sibling, stat):
+    # Siblings are stamped with their source's mtime when written
+    try:
+        return os.stat(sibling).st_mtime_ns == stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def _compress_file(path, encoders):
+    """
+    Writes the missing or stale compressed siblings of one file. Returns the
+    number of siblings written.
+    """
+    stat = os.stat(path)
+    stale = [ext for ext in encoders if not _is_current(path, path + ext, stat)]
+    if not stale:
+        return 0
+    with open(path, 'rb') as f:
+        data = f.read()
+    for ext in stale:
+        sibling = path + ext
+        tmp_path = sibling + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(encoders[ext](data))
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, sibling)
+        logger.debug("Compressed %s", sibling)
+    return len(stale)
+
+def precompress(dest_dir, workers=1):
+    """
+    Writes .gz (and .br when the brotli module is available) siblings for
+    every text file in dest_dir, skipping files whose siblings are already up
+    to date, and deletes siblings whose source is gone. Only siblings of text
+    files are ever deleted, so published archives such as release.tar.gz
+    are kept. zlib and brotli release the GIL, so a thread pool compresses
+    files in parallel.
+    """
+    encoders = _encoders()
+    paths = []
+    orphans = []
+    for root, dirs, files in os.walk(dest_dir):
+        names = set(files)
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if file_name.endswith(COMPRESSED_EXTENSIONS):
+                source = file_name[:-3]
+                if source not in names and source.endswith(TEXT_EXTENSIONS) and not source.startswith("."):
+                    orphans.append(path)
+            elif file_name.endswith(TEXT_EXTENSIONS) and not file_name.startswith("."):
+                paths.append(path)
+    for path in orphans:
+        os.remove(path)
+    
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            written = sum(executor.map(lambda path: _compress_file(path, encoders), paths))
+    else:
+        written = sum(_compress_file(path, encoders) for path in paths)
+    formats = "/".join(ext[1:] for ext in encoders)
+    logger.info("Precompressed (%s): %d files written, %d removed, %d sources", formats, written, len(orphans), len(paths))
+    return written
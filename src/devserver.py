@@ -0,0 +1,265 @@
+import os
+import logging
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from assets import place_file
+from frontmatter import page_metadata
+from htmlnode import set_render_cache
+from main import generate_page, page_destination, page_info
+from manifest import file_hash, remove_output
+from render_cache import RenderCache
+from template import Layouts
+from urls import UrlResolver
+
+logger = logging.getLogger("ssg")
+
+def snapshot(paths):
+    """
+    Returns {path: (mtime_ns, size)} for every file under the given files and
+    directories.
+    """
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, files in os.walk(path):
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                state[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def diff_snapshots(old, new):
+    """
+    Returns (changed, removed) paths between two snapshots. New files count
+    as changed.
+    """
+    changed = [path for path, stat in new.items() if old.get(path) != stat]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+class SiteWatcher():
+    """
+    Keeps the compiled layouts and render cache warm between rebuilds and
+    regenerates only the outputs affected by each change.
+
+    Given the build manifest and catalog of the initial build, rebuilt pages
+    and copied files are recorded in the manifest (saved after each batch),
+    so the next incremental build picks up where the watcher left off, and
+    listings(catalog, layouts, dest_dir, urls) rewrites the listings from
+    the updated catalog. Links are only checked by a full or incremental
+    build.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath="/", cache=None, urls=None,
+                 layouts_dir=None, drafts=False, manifest=None, catalog=None, listings=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.layouts_dir = layouts_dir
+        self.drafts = drafts
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.cache = cache if cache is not None else RenderCache()
+        # Image variants come from the initial build (fingerprinting is
+        # refused with --watch, since edited assets would keep their old names)
+        self.urls = urls if urls is not None else UrlResolver(basepath)
+        # A minify cache means the build writes minified pages
+        self.layouts = Layouts(template_path, layouts_dir, self.urls, self.cache.minify)
+        self.manifest = manifest
+        self.catalog = catalog if catalog is not None else {}
+        self.listings = listings
+        self.state = snapshot(self.watched_paths())
+        # Where each page was last written, since a slug or draft flag can
+        # move or remove it
+        self.outputs = {}
+        for path in self.state:
+            if self._is_page(path):
+                try:
+                    dest_file = self._destination(path)[0]
+                except ValueError:
+                    continue
+                if dest_file is not None:
+                    self.outputs[path] = dest_file
+
+    def watched_paths(self):
+        paths = [self.content_dir, self.static_dir, self.template_path]
+        if self.layouts_dir is not None:
+            paths.append(self.layouts_dir)
+        return paths
+
+    def poll(self):
+        """
+        Rebuilds whatever changed since the last poll. Returns the number of
+        outputs written or removed.
+        """
+        state = snapshot(self.watched_paths())
+        changed, removed = diff_snapshots(self.state, state)
+        self.state = state
+        if not changed and not removed:
+            return 0
+        return self.apply(changed, removed)
+
+    def apply(self, changed, removed):
+        start = time.perf_counter()
+        pages = []
+        updated = 0
+        previous = set_render_cache(self.cache)
+        layouts_changed = any(self._is_layout(path) for path in changed + removed)
+        try:
+            if layouts_changed:
+                # Recompiled layouts are reused from the compile cache
+                # unless their files changed, but any page may use them
+                self.layouts = Layouts(self.template_path, self.layouts_dir, self.urls, self.cache.minify)
+                pages = [path for path in self.state if self._is_page(path)]
+            else:
+                pages = [path for path in changed if self._is_page(path)]
+            for src_file in sorted(pages):
+                updated += self._generate(src_file)
+            for path in changed:
+                if self._is_static(path):
+                    updated += self._copy_static(path)
+            for path in removed:
+                if self._is_page(path):
+                    self._forget(path)
+                    dest_file = self.outputs.pop(path, None)
+                    if dest_file is not None:
+                        remove_output(dest_file, self.dest_dir)
+                        updated += 1
+                elif self._is_static(path):
+                    if self.manifest is not None:
+                        self.manifest.static.pop(os.path.relpath(path, self.static_dir), None)
+                    remove_output(self._static_destination(path), self.dest_dir)
+                    updated += 1
+            if self.listings is not None and (pages or any(self._is_page(path) for path in removed)):
+                self.listings(self.catalog, self.layouts, self.dest_dir, self.urls)
+        finally:
+            set_render_cache(previous)
+        if self.manifest is not None:
+            if layouts_changed:
+                # Every page was rebuilt against the current layout files
+                self.manifest.graph.record_hashes(self.manifest.graph.changed_files())
+            self.manifest.save()
+        logger.info("Rebuilt %d outputs in %.1f ms", updated, (time.perf_counter() - start) * 1000)
+        return updated
+
+    def _destination(self, src_file):
+        """
+        Returns (output path, metadata) for a page, with None as the path for
+        a draft that is not built.
+        """
+        metadata = page_metadata(src_file)
+        if metadata.get("draft") and not self.drafts:
+            return None, metadata
+        return page_destination(src_file, self.content_dir, self.dest_dir, metadata.get("slug")), metadata
+
+    def _generate(self, src_file):
+        previous = self.outputs.get(src_file)
+        try:
+            dest_file, metadata = self._destination(src_file)
+            if dest_file is None:
+                logger.debug("Skipping draft %s", src_file)
+                self._forget(src_file)
+                if previous is None:
+                    return 0
+                del self.outputs[src_file]
+                remove_output(previous, self.dest_dir)
+                return 1
+            template = self.layouts.get(self.layouts.select(os.path.relpath(src_file, self.content_dir), metadata))
+            document = generate_page(src_file, self.template_path, dest_file, self.basepath, template, urls=self.urls)
+            self._remember(src_file, dest_file, metadata, document, template.files)
+        except Exception as e:
+            logger.error("Failed to generate %s: %s: %s", src_file, type(e).__name__, e)
+            # Dropped so the next build retries it
+            self._forget(src_file)
+            return 0
+        self.outputs[src_file] = dest_file
+        if previous is not None and previous != dest_file:
+            remove_output(previous, self.dest_dir)
+        return 1
+
+    def _remember(self, src_file, dest_file, metadata, document, dependencies):
+        """
+        Records a rebuilt page in the catalog and, with a manifest, as the
+        incremental build would have.
+        """
+        rel_src = os.path.normpath(os.path.relpath(src_file, self.content_dir))
+        rel_dest = os.path.normpath(os.path.relpath(dest_file, self.dest_dir))
+        stat = os.stat(src_file)
+        anchors = [heading.id for heading in document.headings]
+        self.catalog[rel_src] = page_info(rel_src, rel_dest, document.title, document.summary, stat.st_mtime,
+                                          document.links, metadata, anchors)
+        if self.manifest is not None:
+            self.manifest.record("pages", rel_src, file_hash(src_file), rel_dest, stat)
+            self.manifest.pages[rel_src].update(title=document.title, summary=document.summary,
+                                                links=[list(link) for link in document.links], anchors=anchors)
+            self.manifest.graph.set_dependencies(rel_src, dependencies)
+
+    def _forget(self, src_file):
+        rel_src = os.path.normpath(os.path.relpath(src_file, self.content_dir))
+        self.catalog.pop(rel_src, None)
+        if self.manifest is not None:
+            self.manifest.pages.pop(rel_src, None)
+            self.manifest.graph.remove(rel_src)
+
+    def _is_page(self, path):
+        return path.endswith('.md') and _is_within(path, self.content_dir)
+
+    def _is_layout(self, path):
+        return path == self.template_path or (self.layouts_dir is not None and _is_within(path, self.layouts_dir))
+
+    def _is_static(self, path):
+        return _is_within(path, self.static_dir)
+
+    def _static_destination(self, path):
+        return os.path.join(self.dest_dir, os.path.relpath(path, self.static_dir))
+
+    def _copy_static(self, path):
+        """
+        Copies a changed static file, returning 1, or 0 if it could not be
+        read (editors' swap and temporary files vanish between polls).
+        """
+        rel_file = os.path.relpath(path, self.static_dir)
+        try:
+            place_file(path, self._static_destination(path))
+            if self.manifest is not None:
+                self.manifest.record("static", rel_file, file_hash(path), rel_file, os.stat(path))
+        except OSError as e:
+            logger.error("Failed to copy %s: %s: %s", path, type(e).__name__, e)
+            if self.manifest is not None:
+                self.manifest.static.pop(rel_file, None)
+            return 0
+        return 1
+
+def _is_within(path, directory):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+def serve(directory, port=8888):
+    """
+    Serves directory over HTTP from a background thread and returns the server.
+    """
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def watch_and_serve(watcher, port=8888, interval=0.5):
+    server = serve(watcher.dest_dir, port)
+    logger.info("Serving %s at http://localhost:%d/ (watching for changes, Ctrl+C to stop)", watcher.dest_dir, port)
+    try:
+        while True:
+            time.sleep(interval)
+            watcher.poll()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
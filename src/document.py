@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+# line is the 1-based source line the heading or link's block starts on;
+# id is the heading's anchor (see heading_id)
+Heading = namedtuple("Heading", ["level", "text", "line", "id"])
+# kind is "link" or "image"; url is as written in the markdown
+Link = namedtuple("Link", ["kind", "url", "line"])
+
+# What the build knows about a generated page, without its content: paths
+# relative to the content and output directories, the URL it is served at,
+# updated as a timestamp (the front matter date, else the source mtime), the
+# front matter and the ids of its headings
+PageInfo = namedtuple("PageInfo", ["source", "output", "url", "title", "summary", "updated", "links", "metadata",
+                                   "anchors"])
+
+class Document():
+    """
+    A converted markdown page: its HTML node tree plus what the same parse
+    pass learned about it (the first h1 as title, the plain text of the
+    first paragraph as summary, every heading, every link and image URL, and
+    page metadata such as front matter).
+    """
+    __slots__ = ("node", "title", "summary", "headings", "links", "metadata", "anchor_counts")
+
+    def __init__(self, node, title=None, headings=None, links=None, metadata=None, summary=None):
+        self.node = node
+        self.title = title
+        self.summary = summary
+        self.headings = headings if headings is not None else []
+        self.links = links if links is not None else []
+        self.metadata = metadata if metadata is not None else {}
+        # How often each anchor was taken, for unique_anchor
+        self.anchor_counts = {}
+
+    def unique_anchor(self, anchor):
+        """
+        Returns anchor, or anchor-1, anchor-2... if an earlier heading of
+        the page already took it, as GitHub numbers repeated headings.
+        """
+        result = anchor
+        while result in self.anchor_counts:
+            self.anchor_counts[anchor] += 1
+            result = f"{anchor}-{self.anchor_counts[anchor]}"
+        self.anchor_counts[result] = 0
+        return result
+
+    def require_title(self):
+        if self.title is None:
+            raise ValueError("No h1 header (# ) found in markdown content")
+        return self.title
+
+    def __repr__(self):
+        return f"Document(title={self.title!r}, headings={len(self.headings)}, links={len(self.links)}, metadata={self.metadata})"
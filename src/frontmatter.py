@@ -0,0 +1,170 @@
+import re
+from datetime import date, datetime, timezone
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+YAML_FENCE = "---"
+TOML_FENCE = "+++"
+FENCES = (YAML_FENCE, TOML_FENCE)
+
+# key: value (YAML) or key = value (TOML) for the fallback parser
+SIMPLE_LINE_RE = re.compile(r"^([A-Za-z_][\w-]*)\s*[:=]\s*(.*)$")
+# YAML 1.1 booleans, as PyYAML reads them
+TRUE_VALUES = ("true", "yes", "on")
+FALSE_VALUES = ("false", "no", "off")
+
+def _simple_value(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_simple_value(item) for item in text[1:-1].split(",") if item.strip()]
+    if text[:1] in ("[", "{") or text[-1:] in ("]", "}"):
+        raise ValueError(f"Unbalanced list or mapping in front matter: {text}")
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.lower() in TRUE_VALUES + FALSE_VALUES:
+        return text.lower() in TRUE_VALUES
+    return text
+
+def parse_simple(header):
+    """
+    Parses flat key: value or key = value lines, with [a, b] and "- item"
+    lists, for when neither PyYAML nor tomllib is available. Booleans follow
+    YAML 1.1 (yes/no, on/off) like PyYAML; dates are left as strings.
+    """
+    metadata = {}
+    key = None
+    for line in header.split("\n"):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None:
+            if not isinstance(metadata[key], list):
+                metadata[key] = []
+            metadata[key].append(_simple_value(stripped[2:]))
+            continue
+        match = SIMPLE_LINE_RE.match(stripped)
+        if match is None:
+            raise ValueError(f"Unsupported front matter line: {line}")
+        key = match.group(1)
+        metadata[key] = _simple_value(match.group(2))
+    return metadata
+
+def parse_front_matter(header, fence=YAML_FENCE):
+    """
+    Parses the text between the front matter fences: YAML for ---, TOML for
+    +++. Returns the normalized metadata dict.
+    """
+    if fence == TOML_FENCE and tomllib is not None:
+        try:
+            metadata = tomllib.loads(header)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid TOML front matter: {e}")
+    elif fence == YAML_FENCE and yaml is not None:
+        try:
+            metadata = yaml.safe_load(header)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML front matter: {e}")
+    else:
+        metadata = parse_simple(header)
+    if metadata is None:
+        metadata = {}
+    if not isinstance(metadata, dict):
+        raise ValueError("Front matter must be a mapping of keys to values")
+    return normalize(metadata)
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp()
+    try:
+        return _timestamp(datetime.fromisoformat(str(value)))
+    except ValueError:
+        raise ValueError(f"Invalid front matter date: {value}")
+
+def normalize(metadata):
+    """
+    Converts the fields the generator uses to plain types, so metadata can be
+    stored in the manifest: date becomes a UTC timestamp, draft a bool, tags
+    a list of strings, slug and layout strings. Other keys are kept as they
+    are. A slug or layout must be a single path segment, so neither can
+    point outside the output or layouts directory.
+    """
+    metadata = dict(metadata)
+    if "date" in metadata:
+        metadata["date"] = _timestamp(metadata["date"])
+    if "draft" in metadata:
+        draft = metadata["draft"]
+        metadata["draft"] = draft.lower() in TRUE_VALUES if isinstance(draft, str) else bool(draft)
+    if "tags" in metadata:
+        tags = metadata["tags"]
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        metadata["tags"] = [str(tag).strip() for tag in tags or () if str(tag).strip()]
+    for key in ("slug", "layout"):
+        if key in metadata:
+            value = str(metadata[key]).strip("/")
+            if value in (".", "..") or "/" in value or "\\" in value:
+                raise ValueError(f"Front matter {key} must be a single path segment: {metadata[key]}")
+            metadata[key] = value
+    return metadata
+
+def read_front_matter(f):
+    """
+    Reads the front matter from a binary file-like object (an open file or
+    a memory map) positioned at its start, consuming only the header.
+
+    Returns (metadata, header_lines): header_lines counts the lines up to and
+    including the closing fence, and is 0 (with nothing consumed beyond the
+    first line) when there is no front matter.
+    """
+    first = f.readline()
+    fence = str(first, "utf-8").rstrip("\r\n")
+    if fence not in FENCES:
+        f.seek(0)
+        return {}, 0
+    header = []
+    for raw in iter(f.readline, b""):
+        line = str(raw, "utf-8").rstrip("\r\n")
+        if line == fence:
+            return parse_front_matter("\n".join(header), fence), len(header) + 2
+        header.append(line)
+    raise ValueError(f"Front matter opened with {fence} is never closed")
+
+def split_front_matter(markdown):
+    """
+    Returns (metadata, markdown) with the front matter lines of markdown
+    blanked out, so block line numbers still match the file.
+    """
+    # Only the header is split into lines; the body is sliced off once
+    end = markdown.find("\n")
+    fence = (markdown if end == -1 else markdown[:end]).rstrip("\r")
+    if fence not in FENCES:
+        return {}, markdown
+    header = []
+    while end != -1:
+        start = end + 1
+        end = markdown.find("\n", start)
+        line = markdown[start:] if end == -1 else markdown[start:end]
+        if line.rstrip("\r") == fence:
+            metadata = parse_front_matter("\n".join(header), fence)
+            return metadata, "\n" * (len(header) + 2) + ("" if end == -1 else markdown[end + 1:])
+        header.append(line)
+    raise ValueError(f"Front matter opened with {fence} is never closed")
+
+def page_metadata(path):
+    """
+    Returns the front matter of a markdown file, reading only its header.
+    """
+    with open(path, 'rb') as f:
+        return read_front_matter(f)[0]
@@ -1,4 +1,17 @@
+import re
+
+# Minified output collapses whitespace in text, leaves attribute values
+# unquoted where HTML allows it and omits end tags that are implied. The
+# content of these elements is emitted exactly as built.
+PREFORMATTED_TAGS = frozenset(("pre", "textarea", "script", "style"))
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+# HTML only collapses ASCII whitespace; \s would also eat no-break spaces
+HTML_SPACE = r"[ \t\n\f\r]"
+WHITESPACE_RE = re.compile(HTML_SPACE + "+")
+UNQUOTED_VALUE_RE = re.compile(r"[^\s\"'=<>`]+")
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
 
     def __init__(self, value=None, children=None, props=None, tag=None):
         self.tag = tag
@@ -6,12 +19,31 @@ class HTMLNode():
         self.children = children
         self.props = props
     
-    def to_html(self):
+    def to_html(self, minify=False):
+        return "".join(self.iter_html(minify))
+    
+    def iter_html(self, minify=False, close=True):
+        """
+        Yields the HTML of this node as a sequence of fragments, so a document
+        can be written out without building its full string per nesting level.
+        With minify, whitespace and optional syntax are dropped as it is
+        emitted; close=False leaves out an end tag the parent knows is implied.
+        """
         raise NotImplementedError("Subclasses should implement this method")
     
-    def props_to_html(self):
+    def write_html(self, fp, minify=False):
+        write = fp.write
+        for fragment in self.iter_html(minify):
+            write(fragment)
+    
+    def props_to_html(self, minify=False):
         if self.props is None:
             return ""
+        if minify:
+            return "".join([
+                f" {key}={value}" if UNQUOTED_VALUE_RE.fullmatch(str(value)) else f' {key}="{value}"'
+                for key, value in self.props.items()
+            ])
         props_str = " ".join([f'{key}="{value}"' for key, value in self.props.items()])
         return f" {props_str}"
     
@@ -19,10 +51,17 @@ class HTMLNode():
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(value, None, props, tag)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
     
-    def to_html(self):
+    def to_html(self, minify=False):
+        if minify:
+            return "".join(self.iter_html(True))
         if self.value is None:
             raise ValueError("LeafNode value cannot be None")
         if self.tag is None:
@@ -30,33 +69,198 @@ class LeafNode(HTMLNode):
         props_str = self.props_to_html()
         return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
     
+    def iter_html(self, minify=False, close=True):
+        if self.value is None:
+            raise ValueError("LeafNode value cannot be None")
+        value = self.value
+        if minify and self.tag not in PREFORMATTED_TAGS:
+            value = WHITESPACE_RE.sub(" ", value)
+        if self.tag is None:
+            yield value
+            return
+        yield f"<{self.tag}{self.props_to_html(minify)}>"
+        if minify and self.tag in VOID_TAGS:
+            return
+        yield value
+        if close:
+            yield f"</{self.tag}>"
+
+class StreamNode(HTMLNode):
+    """
+    A parent element whose children come from an iterator and are serialized
+    as they are produced, so only one child is alive at a time. It can only
+    be rendered once.
+    """
+    __slots__ = ()
+
+    def __init__(self, tag, children, props=None):
+        super().__init__(None, children, props, tag)
+    
+    def iter_html(self, minify=False, close=True):
+        yield f"<{self.tag}{self.props_to_html(minify)}>"
+        for child in self.children:
+            yield from child.iter_html(minify)
+        if close:
+            yield f"</{self.tag}>"
+
+class FragmentNode(LeafNode):
+    """
+    Already serialized HTML (e.g. a cached block), emitted unchanged in
+    either output mode.
+    """
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+    
+    def to_html(self, minify=False):
+        return self.value
+    
+    def iter_html(self, minify=False, close=True):
+        yield self.value
+    
 class ParentNode(HTMLNode):
+    # Trusted nodes were built by the internal pipeline (or validated once)
+    # and are rendered without re-checking their children
+    __slots__ = ("is_trusted",)
+
     def __init__(self, tag, children, props=None):
         if not isinstance(tag, str) or not tag.strip():
             raise ValueError("ParentNode 'tag' must be a non-empty string")
         if not isinstance(children, list) or not all(isinstance(child, HTMLNode) for child in children):
             raise ValueError("ParentNode 'children' must be a list of HTMLNode instances")
         super().__init__(None, children, props, tag)
+        self.is_trusted = False
     
-    def to_html(self):
+    @classmethod
+    def trusted(cls, tag, children, props=None):
+        """
+        Builds a ParentNode without validating its arguments. Only for trees
+        built by markdown_to_html_node, whose tags and children are known good.
+        """
+        node = cls.__new__(cls)
+        node.tag = tag
+        node.value = None
+        node.children = children
+        node.props = props
+        node.is_trusted = True
+        return node
+    
+    def validate(self):
+        """
+        Checks this subtree once and marks it trusted, so later renders skip
+        the per-node checks. The tree must not be modified afterwards.
+        """
+        self._check()
+        for child in self.children:
+            if isinstance(child, ParentNode):
+                child.validate()
+        self.is_trusted = True
+        return self
+    
+    def _check(self):
         if self.tag is None:
             raise ValueError("ParentNode tag cannot be None")
         if not self.children:
             raise ValueError("ParentNode must have children")
         if not isinstance(self.children, list) or not all(isinstance(child, HTMLNode) for child in self.children):
             raise ValueError("ParentNode children must be a list of HTMLNode instances")
-        props_str = self.props_to_html()
-        children_html = "".join([child.to_html() for child in self.children])
-        return f"<{self.tag}{props_str}>{children_html}</{self.tag}>"
+    
+    def iter_html(self, minify=False, close=True):
+        if not self.is_trusted:
+            self._check()
+        yield f"<{self.tag}{self.props_to_html(minify)}>"
+        if not minify:
+            for child in self.children:
+                yield from child.iter_html()
+        elif self.tag in PREFORMATTED_TAGS:
+            # Whitespace inside <pre><code> is content
+            for child in self.children:
+                yield from child.iter_html()
+        else:
+            children = self.children
+            last = len(children) - 1
+            for i, child in enumerate(children):
+                # </li> is implied by the next <li> or the end of the list
+                implied = child.tag == "li" and (i == last or children[i + 1].tag == "li")
+                yield from child.iter_html(True, not implied)
+        if close:
+            yield f"</{self.tag}>"
 
-import re
-from md_to_textnode import block_to_block_type, markdown_to_blocks, text_to_textnodes
+from time import perf_counter
+from md_to_textnode import as_block, heading_id, scan_block_lines, scan_blocks, text_to_textnodes
 from textnode import BlockType, TextNode, TextType
+from document import Document, Heading, Link
+from frontmatter import split_front_matter
+
+# Build-wide block cache, installed by the build with set_render_cache()
+_render_cache = None
+# PageProfile of the page being converted, installed with set_page_profile()
+_page_profile = None
+# (kind, url) pairs found in the block being converted
+_block_links = None
+
+def set_render_cache(cache):
+    """
+    Installs the RenderCache consulted by block_to_html_node and
+    code_to_html_node, returning the previously installed one.
+    """
+    global _render_cache
+    previous = _render_cache
+    _render_cache = cache
+    return previous
+
+def set_page_profile(profile):
+    """
+    Installs the PageProfile that stage timings are recorded into, returning
+    the previously installed one.
+    """
+    global _page_profile
+    previous = _page_profile
+    _page_profile = profile
+    return previous
+
+def _timed(stage, fn, arg):
+    profile = _page_profile
+    if profile is None:
+        return fn(arg)
+    start = perf_counter()
+    result = fn(arg)
+    profile.add(stage, perf_counter() - start)
+    return result
 
-def text_node_to_html_node(text_node):
+def _cached_render(block, urls, render, variant):
+    global _block_links
+    cache = _render_cache
+    if cache is None:
+        return render(block, urls)
+    if cache.minify:
+        variant += ":min"
+    key = cache.key(block.text, variant)
+    entry = cache.get(key)
+    if entry is None:
+        # The block's links are cached with its fragment, since a cache hit
+        # never parses the block
+        previous = _block_links
+        _block_links = links = []
+        try:
+            fragment = render(block, urls).to_html(cache.minify)
+        finally:
+            _block_links = previous
+        entry = [fragment, links]
+        cache.put(key, entry)
+    if _block_links is not None:
+        _block_links.extend(entry[1])
+    # The fragment is already HTML, so it is emitted as-is
+    return FragmentNode(entry[0])
+
+def text_node_to_html_node(text_node, urls=None):
     """Convert a TextNode to an HTMLNode."""
     if not isinstance(text_node, TextNode):
         raise ValueError("Expected a TextNode")
+    url = text_node.url
+    if url and urls is not None:
+        url = urls(url)
         
     # Handle empty text based on type
     if not text_node.text:
@@ -70,9 +274,12 @@ def text_node_to_html_node(text_node):
             case TextType.CODE:
                 return LeafNode("code", "")
             case TextType.LINK:
-                return LeafNode("a", "", {"href": text_node.url or ""})
+                return LeafNode("a", "", {"href": url or ""})
             case TextType.IMAGE:
-                return LeafNode("img", "", {"src": text_node.url or "", "alt": ""})
+                props = {"src": url or "", "alt": ""}
+                if urls is not None and text_node.url:
+                    props.update(urls.image_attributes(text_node.url))
+                return LeafNode("img", "", props)
             case _:
                 return LeafNode(None, "")
                 
@@ -87,148 +294,228 @@ def text_node_to_html_node(text_node):
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text_node.text, {"href": url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            props = {"src": url, "alt": text_node.text}
+            if urls is not None:
+                props.update(urls.image_attributes(text_node.url))
+            return LeafNode("img", "", props)
         case _:
             raise ValueError(f"Invalid TextType: {text_node.text_type}")
         
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        if block.strip():  # Only process non-empty blocks
-            if block.startswith("```"):
-                # Handle code blocks
-                html_node = code_to_html_node(block)
-            else:
-                html_node = block_to_html_node(block)
-            children.append(html_node)
+def markdown_to_html_node(markdown, urls=None):
+    return markdown_to_document(markdown, urls).node
+
+def markdown_to_document(markdown, urls=None):
+    """
+    Converts markdown into a Document. Front matter becomes the document's
+    metadata; the title, headings and links are collected from the blocks as
+    they are converted, so the text is scanned once.
+    """
+    metadata, markdown = split_front_matter(markdown)
+    blocks = _timed("blocks", _scan, markdown)
+    return _blocks_to_document(blocks, urls, Document(None, metadata=metadata))
+
+def markdown_lines_to_document(lines, urls=None, metadata=None):
+    """
+    Like markdown_to_document, for an iterable of lines without their line
+    endings whose front matter was already parsed into metadata (such as
+    MarkdownSource.lines()). Blocks are scanned as the lines are read, so
+    the text is never held as one string.
+    """
+    return _blocks_to_document(scan_block_lines(lines), urls, Document(None, metadata=metadata))
+
+def _blocks_to_document(blocks, urls, document):
+    children = [_convert_block(block, urls, document) for block in blocks]
     
     # Ensure we have at least one child, even if it's just an empty paragraph
     if not children:
-        children = [ParentNode("p", [LeafNode(None, "")])]
-    return ParentNode("div", children)
+        children = [ParentNode.trusted("p", [LeafNode(None, "")])]
+    document.node = ParentNode.trusted("div", children)
+    return document
+
+def markdown_stream_to_html_node(lines, urls=None, document=None):
+    """
+    Like markdown_to_html_node, but for an iterable of lines (such as an open
+    file): blocks are read, converted and rendered one at a time when the
+    returned StreamNode is written out. A given Document collects the
+    headings and links as the blocks go by.
+    """
+    if document is None:
+        document = Document(None)
+    return StreamNode("div", _stream_block_nodes(lines, urls, document))
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+def _stream_block_nodes(lines, urls, document):
+    empty = True
+    for block in scan_block_lines(line.rstrip("\n") for line in lines):
+        yield _convert_block(block, urls, document)
+        empty = False
+    if empty:
+        yield ParentNode.trusted("p", [LeafNode(None, "")])
+
+def _convert_block(block, urls, document):
+    global _block_links
+    if block.type == BlockType.CODE:
+        # Handle code blocks
+        return code_to_html_node(block)
+    line = block.start + 1
+    anchor = None
+    if block.type == BlockType.HEADING:
+        level = len(block.text) - len(block.text.lstrip("#"))
+        text = block.text[level + 1 :].strip()
+        anchor = document.unique_anchor(heading_id(text))
+        document.headings.append(Heading(level, text, line, anchor))
+        if document.title is None and level == 1:
+            document.title = block.lines[0][2:].strip()
+    elif block.type == BlockType.PARAGRAPH and document.summary is None:
+        document.summary = paragraph_summary(block)
+    previous = _block_links
+    _block_links = links = []
+    try:
+        html_node = block_to_html_node(block, urls, anchor)
+    finally:
+        _block_links = previous
+    for kind, url in links:
+        document.links.append(Link(kind, url, line))
+    return html_node
+
+def paragraph_summary(block):
+    """
+    Returns the plain text of a paragraph block, or None if it holds nothing
+    but links and images.
+    """
+    text_nodes = text_to_textnodes(" ".join([line.strip() for line in block.lines]))
+    if not any(node.text_type != TextType.LINK and node.text_type != TextType.IMAGE and node.text.strip()
+               for node in text_nodes):
+        return None
+    return "".join([node.text for node in text_nodes if node.text_type != TextType.IMAGE]).strip()
+
+def _scan(markdown):
+    return list(scan_blocks(markdown))
+
+def text_to_children(text, urls=None):
+    text_nodes = _timed("inline", text_to_textnodes, text)
+    if _page_profile is not None:
+        _page_profile.text_nodes += len(text_nodes)
+    links = _block_links
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, urls)
         children.append(html_node)
+        if links is not None and text_node.url is not None:
+            links.append(("image" if text_node.text_type == TextType.IMAGE else "link", text_node.url))
     return children
     
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def block_to_html_node(block, urls=None, anchor=None):
+    """
+    Converts a block to its HTML node. anchor is the id a heading block
+    gets, in place of the one derived from its own text.
+    """
+    block = as_block(block)
+    urls_key = urls.cache_key if urls is not None else "/"
+    if block.type == BlockType.HEADING:
+        # The id depends on the page's other headings, so it is part of the key
+        render = lambda block, urls: heading_to_html_node(block, urls, anchor)
+        return _cached_render(block, urls, render, f"heading:{urls_key}#{anchor}")
+    return _cached_render(block, urls, _block_to_html_node, f"block:{urls_key}")
+
+def _block_to_html_node(block, urls=None):
+    block_type = block.type
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(block, urls)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, urls)
     if block_type == BlockType.CODE:
-        return code_to_html_node(block)
+        return _code_to_html_node(block)
     if block_type == BlockType.ORDERED_LIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(block, urls)
     if block_type == BlockType.UNORDERED_LIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(block, urls)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(block, urls)
     raise ValueError("invalid block type")
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(block, urls=None):
+    block = as_block(block)
     # Join lines and normalize whitespace
-    paragraph = " ".join([line.strip() for line in lines])
-    children = text_to_children(paragraph)
-    return ParentNode("p", children)
+    paragraph = " ".join([line.strip() for line in block.lines])
+    children = text_to_children(paragraph, urls)
+    return ParentNode.trusted("p", children)
 
 
-def heading_to_html_node(block):
-    level = 0
-    for char in block:
-        if char == "#":
-            level += 1
-        else:
-            break
-    if level + 1 >= len(block):
+def heading_to_html_node(block, urls=None, anchor=None):
+    """
+    Converts a heading block, with anchor (by default derived from the
+    heading text by heading_id) as its id. Headings whose text yields no
+    anchor get no id.
+    """
+    block = as_block(block)
+    text = block.text
+    level = len(text) - len(text.lstrip("#"))
+    if level + 1 >= len(text):
         raise ValueError(f"invalid heading level: {level}")
-    text = block[level + 1 :]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    text = text[level + 1 :]
+    if anchor is None:
+        anchor = heading_id(text)
+    children = text_to_children(text, urls)
+    return ParentNode.trusted(f"h{level}", children, {"id": anchor} if anchor else None)
 
 
 def code_to_html_node(block):
-    # Split the block into lines
-    lines = block.split("\n")
-    
-    # Remove empty lines at the beginning and end
-    while lines and not lines[0].strip():
-        lines.pop(0)
-    while lines and not lines[-1].strip():
-        lines.pop()
-    
-    # Find the starting and ending lines with ```
-    start_index = -1
-    end_index = -1
-    
-    for i, line in enumerate(lines):
-        if line.strip() == "```":
-            if start_index == -1:
-                start_index = i
-            else:
-                end_index = i
-                break
-    
-    if start_index != -1 and end_index != -1:
-        # Get lines between the backticks and strip any common indentation
-        content_lines = lines[start_index+1:end_index]
-        
-        # Remove common leading whitespace
-        if content_lines:
-            min_indent = min(len(line) - len(line.lstrip()) for line in content_lines if line.strip())
-            content_lines = [line[min_indent:] if len(line) >= min_indent else line for line in content_lines]
-        
-        # Add trailing newline to match expected output
-        content = "\n".join(content_lines) + "\n"
-    else:
-        # Fallback if backticks aren't found
-        content = block
+    block = as_block(block)
+    return _cached_render(block, None, _code_to_html_node, "code")
+
+def _code_to_html_node(block, urls=None):
+    # The lines between the fences; an unclosed fence has no closing line
+    lines = block.lines
+    closed = len(lines) > 1 and lines[-1].strip() == "```"
+    content_lines = lines[1:-1] if closed else lines[1:]
+    
+    # Remove common leading whitespace
+    indents = [len(line) - len(line.lstrip()) for line in content_lines if line.strip()]
+    if indents:
+        min_indent = min(indents)
+        content_lines = [line[min_indent:] if len(line) >= min_indent else line for line in content_lines]
+    
+    # Add trailing newline to match expected output
+    content = "\n".join(content_lines) + "\n"
     
     # Create TextNode for the code content
     text_node = TextNode(content, TextType.TEXT)  # Use TextType.TEXT instead of TextType.CODE
     # Convert to HTML node
     code_html_node = text_node_to_html_node(text_node)
     # Wrap it in <pre><code> tags
-    return ParentNode("pre", [ParentNode("code", [code_html_node])])
+    return ParentNode.trusted("pre", [ParentNode.trusted("code", [code_html_node])])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(block, urls=None):
+    block = as_block(block)
     html_items = []
-    for item in items:
+    for item in block.lines:
         text = item[3:]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
-    return ParentNode("ol", html_items)
+        children = text_to_children(text, urls)
+        html_items.append(ParentNode.trusted("li", children))
+    return ParentNode.trusted("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(block, urls=None):
+    block = as_block(block)
     html_items = []
-    for item in items:
+    for item in block.lines:
         text = item[2:]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
-    return ParentNode("ul", html_items)
+        children = text_to_children(text, urls)
+        html_items.append(ParentNode.trusted("li", children))
+    return ParentNode.trusted("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(block, urls=None):
+    block = as_block(block)
     new_lines = []
-    for line in lines:
+    for line in block.lines:
         if not line.startswith(">"):
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
-    return ParentNode("blockquote", children)
\ No newline at end of file
+    children = text_to_children(content, urls)
+    return ParentNode.trusted("blockquote", children)
\ No newline at end of file
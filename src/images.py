@@ -0,0 +1,155 @@
+import json
+import os
+import struct
+import logging
+from assets import place_file
+from manifest import file_hash, remove_output, write_if_changed
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger("ssg")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+DEFAULT_WIDTHS = (480, 960, 1600)
+IMAGE_MANIFEST_NAME = "image-manifest.json"
+JPEG_QUALITY = 82
+
+def read_image_size(path):
+    """
+    Returns (width, height) from a PNG, GIF or JPEG header without decoding
+    the image, or None for anything else.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] != b"\xff\xd8":
+            return None
+        # Walk the JPEG segments up to the first start-of-frame marker
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                f.read(3)
+                height, width = struct.unpack(">HH", f.read(4))
+                return width, height
+            length = struct.unpack(">H", f.read(2))[0]
+            f.seek(length - 2, os.SEEK_CUR)
+
+def variant_name(rel_path, content_hash, width):
+    """
+    images/tom.png -> images/tom.<hash>.480w.png. Variants are named after the
+    source hash, so a name never refers to two different images.
+    """
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{content_hash[:10]}.{width}w{ext}"
+
+def _save(image, path, ext):
+    if ext in (".jpg", ".jpeg"):
+        image.convert("RGB").save(path, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif ext == ".png":
+        image.save(path, optimize=True)
+    else:
+        image.save(path)
+
+def _render_variants(src_file, rel_path, content_hash, widths, cache_entry_dir):
+    """
+    Writes recompressed variants of one image into its cache directory and
+    returns the metadata describing them.
+    """
+    ext = os.path.splitext(rel_path)[1].lower()
+    os.makedirs(cache_entry_dir, exist_ok=True)
+    with Image.open(src_file) as image:
+        width, height = image.size
+        variants = []
+        for target in sorted({w for w in widths if w < width} | {width}):
+            name = variant_name(rel_path, content_hash, target)
+            out_path = os.path.join(cache_entry_dir, os.path.basename(name))
+            if target == width:
+                resized = image
+            else:
+                resized = image.resize((target, round(height * target / width)), Image.LANCZOS)
+            _save(resized, out_path, ext)
+            variants.append([name, target])
+    return {"width": width, "height": height, "variants": variants}
+
+def process_images(src, dst, cache_dir, widths=DEFAULT_WIDTHS, link_mode="auto", manifest=None):
+    """
+    Generates downscaled, recompressed variants of every image in src and
+    places them in dst. Work is cached under cache_dir by source hash, so an
+    unchanged image is never processed twice. Without Pillow only the image
+    dimensions are recorded.
+
+    Returns {"/images/x.png": {"width", "height", "variants": [[url, width]]}}
+    for the page renderer.
+    """
+    os.makedirs(dst, exist_ok=True)
+    widths = tuple(sorted(widths))
+    manifest_path = os.path.join(dst, IMAGE_MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    if Image is None:
+        logger.warning("Pillow is not installed: images keep their original files, only width/height are added")
+
+    images = {}
+    placed_files = {}
+    processed = 0
+    for root, dirs, files in os.walk(src):
+        relative_path = os.path.relpath(root, src)
+        for file_name in files:
+            if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            src_file = os.path.join(root, file_name)
+            rel_file = os.path.normpath(os.path.join(relative_path, file_name)).replace(os.sep, "/")
+            entry = manifest.static.get(rel_file) if manifest is not None else None
+            content_hash = entry["hash"] if entry else file_hash(src_file)
+            cache_entry_dir = os.path.join(cache_dir, content_hash)
+            meta_path = os.path.join(cache_entry_dir, "meta.json")
+            meta = None
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                # Cached before Pillow was available, or with other widths
+                if Image is not None and meta.get("widths") != list(widths):
+                    meta = None
+            if meta is None:
+                if Image is not None:
+                    meta = _render_variants(src_file, rel_file, content_hash, widths, cache_entry_dir)
+                else:
+                    size = read_image_size(src_file)
+                    if size is None:
+                        continue
+                    meta = {"width": size[0], "height": size[1], "variants": []}
+                    os.makedirs(cache_entry_dir, exist_ok=True)
+                processed += 1
+                logger.debug("Processed image: %s", src_file)
+                meta["widths"] = list(widths) if Image is not None else None
+                with open(meta_path, 'w') as f:
+                    json.dump(meta, f)
+            for name, width in meta["variants"]:
+                dst_file = os.path.join(dst, name)
+                if not os.path.exists(dst_file):
+                    place_file(os.path.join(cache_entry_dir, os.path.basename(name)), dst_file, link_mode)
+                placed_files[name] = rel_file
+            images["/" + rel_file] = {
+                "width": meta["width"],
+                "height": meta["height"],
+                "variants": [["/" + name, width] for name, width in meta["variants"]],
+            }
+
+    for name in previous:
+        if name not in placed_files:
+            remove_output(os.path.join(dst, name), dst)
+    write_if_changed(manifest_path, json.dumps(placed_files, indent=1, sort_keys=True))
+    logger.info("Images: %d processed, %d cached", processed, len(images) - processed)
+    return images
@@ -0,0 +1,88 @@
+import json
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+class LinkIndex():
+    """
+    Site-wide index of the links each page makes, keyed by the page's source
+    path, plus the output path the page was written to and the ids of its
+    headings.
+
+    check() compares every internal link and asset reference against the
+    files in the output directory, so the whole site is verified with one
+    directory walk and one set lookup per link.
+    """
+
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, source, output, links, anchors=()):
+        """
+        Records a page's links and anchors. output is the page's path
+        relative to the output directory; links are (kind, url, line)
+        triples.
+        """
+        self.pages[source] = (output.replace(os.sep, "/"), [tuple(link) for link in links], list(anchors))
+
+    def check(self, dest_dir):
+        """
+        Returns a report dict listing every internal link whose target was
+        not generated, or whose fragment names no heading of the page it
+        points at. External links (with a scheme or host) are counted but
+        not checked; fragments are only checked on indexed pages.
+        """
+        outputs = set()
+        for root, dirs, files in os.walk(dest_dir):
+            relative_path = os.path.relpath(root, dest_dir).replace(os.sep, "/")
+            for file_name in files:
+                outputs.add(posixpath.normpath(posixpath.join(relative_path, file_name)))
+
+        anchors = {}
+        for output, links, page_anchors in self.pages.values():
+            anchors.setdefault(output, set()).update(page_anchors)
+
+        checked = 0
+        external = 0
+        broken = []
+        for source, (output, links, page_anchors) in sorted(self.pages.items()):
+            for kind, url, line in links:
+                target = _link_target(url, output)
+                if target is None:
+                    external += 1
+                    continue
+                checked += 1
+                path, fragment = target
+                if path not in outputs:
+                    # /blog/tom is served by blog/tom/index.html
+                    path = posixpath.normpath(posixpath.join(path, "index.html"))
+                if path not in outputs or (fragment and path in anchors and fragment not in anchors[path]):
+                    broken.append({"source": source, "line": line, "kind": kind, "url": url})
+        return {
+            "pages": len(self.pages),
+            "checked": checked,
+            "external": external,
+            "broken": broken,
+        }
+
+def _link_target(url, output):
+    """
+    Returns (path, fragment) for the output path url points at, relative to
+    the output directory, or None for links that are not checked. A bare
+    fragment points at the page itself.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not (parts.path or parts.fragment):
+        return None
+    path = unquote(parts.path)
+    fragment = unquote(parts.fragment)
+    if not path:
+        return output, fragment
+    if path.startswith("/"):
+        return posixpath.normpath("." + path), fragment
+    return posixpath.normpath(posixpath.join(posixpath.dirname(output), path)), fragment
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
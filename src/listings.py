@@ -0,0 +1,171 @@
+import io
+import os
+import logging
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+from htmlnode import LeafNode, ParentNode
+from manifest import remove_output, write_if_changed
+from md_to_textnode import text_to_textnodes
+from template import page_values
+from textnode import TextType
+
+logger = logging.getLogger("ssg")
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "atom.xml"
+FEED_SIZE = 20
+DEFAULT_PAGE_SIZE = 10
+
+def page_url(output):
+    """
+    blog/tom/index.html -> /blog/tom, index.html -> /, notes.html -> /notes.html
+    """
+    if output == "index.html":
+        return "/"
+    if output.endswith("/index.html"):
+        return "/" + output[:-len("/index.html")]
+    return "/" + output
+
+def plain_text(markdown):
+    """
+    Returns inline markdown as plain text, keeping link text and dropping
+    images.
+    """
+    return "".join([node.text for node in text_to_textnodes(markdown) if node.text_type != TextType.IMAGE])
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def section_pages(catalog, section):
+    """
+    Returns the catalog entries under a section, newest first. The section's
+    own index page is not one of them.
+    """
+    prefix = section.strip("/") + "/"
+    pages = [info for info in catalog.values()
+             if info.output.startswith(prefix) and info.output != prefix + "index.html"]
+    pages.sort(key=lambda info: info.url)
+    pages.sort(key=lambda info: info.updated, reverse=True)
+    return pages
+
+def _index_output(section, number, outputs):
+    # The first page takes the section's URL unless a content page owns it
+    first = f"{section}/index.html"
+    if number == 1 and first not in outputs:
+        return first
+    return f"{section}/page/{number}/index.html"
+
+def _index_node(heading, pages, urls, newer, older):
+    items = []
+    for info in pages:
+        children = [
+            ParentNode("a", [LeafNode(None, plain_text(info.title))], {"href": urls(info.url)}),
+            LeafNode(None, " "),
+            LeafNode("time", _timestamp(info.updated)[:10], {"datetime": _timestamp(info.updated)}),
+        ]
+        if info.summary:
+            children.append(LeafNode("p", info.summary))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", heading)]
+    if items:
+        children.append(ParentNode("ul", items))
+    links = []
+    if newer is not None:
+        links.append(LeafNode("a", "Newer", {"href": urls(newer), "rel": "prev"}))
+    if older is not None:
+        links.append(LeafNode("a", "Older", {"href": urls(older), "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+def write_section_indexes(catalog, section, template, dest_dir, urls, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Writes paginated index pages listing a section's pages (title, date and
+    summary), rendered with the page template. Index pages left over from a
+    longer listing are removed.
+
+    Returns [(url, updated)] for the index pages.
+    """
+    section = section.strip("/")
+    pages = section_pages(catalog, section)
+    outputs = {info.output for info in catalog.values()}
+    chunks = [pages[i:i + page_size] for i in range(0, len(pages), page_size)] or [[]]
+    heading = section.replace("-", " ").capitalize()
+    index_outputs = [_index_output(section, number, outputs) for number in range(1, len(chunks) + 1)]
+    index_urls = [page_url(output) for output in index_outputs]
+
+    listed = []
+    written = 0
+    for i, chunk in enumerate(chunks):
+        title = heading if i == 0 else f"{heading} (page {i + 1})"
+        newer = index_urls[i - 1] if i > 0 else None
+        older = index_urls[i + 1] if i + 1 < len(chunks) else None
+        buffer = io.StringIO()
+        template.write(buffer, **page_values(template, title, _index_node(title, chunk, urls, newer, older)))
+        if write_if_changed(os.path.join(dest_dir, index_outputs[i]), buffer.getvalue()):
+            written += 1
+        listed.append((index_urls[i], max([info.updated for info in chunk], default=0)))
+
+    number = len(chunks) + 1
+    while True:
+        stale = os.path.join(dest_dir, section, "page", str(number), "index.html")
+        if not os.path.exists(stale):
+            break
+        remove_output(stale, dest_dir)
+        number += 1
+    logger.info("Section index /%s: %d pages on %d index pages, %d written", section, len(pages), len(chunks), written)
+    return listed
+
+def write_sitemap(catalog, dest_dir, site_url, extra_urls=()):
+    """
+    Writes sitemap.xml listing every page (plus extra_urls, as (url, updated)
+    pairs) with its absolute URL and last modification time.
+    """
+    base = site_url.rstrip("/")
+    entries = [(info.url, info.updated) for info in catalog.values()] + list(extra_urls)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url, updated in sorted(entries):
+        lines.append(f"  <url><loc>{escape(base + url)}</loc><lastmod>{_timestamp(updated)}</lastmod></url>")
+    lines.append("</urlset>")
+    write_if_changed(os.path.join(dest_dir, SITEMAP_NAME), "\n".join(lines) + "\n")
+    logger.info("Sitemap: %d URLs", len(entries))
+
+def write_feed(catalog, section, dest_dir, site_url, size=FEED_SIZE):
+    """
+    Writes an Atom feed of the newest pages in a section. The feed is titled
+    after the site's home page.
+    """
+    base = site_url.rstrip("/")
+    section = section.strip("/")
+    pages = section_pages(catalog, section)[:size]
+    home = next((info for info in catalog.values() if info.url == "/"), None)
+    title = plain_text(home.title) if home is not None and home.title else section.capitalize()
+    updated = max([info.updated for info in pages], default=0)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f"  <id>{escape(base + '/')}</id>",
+        f"  <link href={quoteattr(base + '/')}/>",
+        f"  <link rel=\"self\" href={quoteattr(base + '/' + FEED_NAME)}/>",
+        f"  <updated>{_timestamp(updated)}</updated>",
+        f"  <author><name>{escape(title)}</name></author>",
+    ]
+    for info in pages:
+        url = base + info.url
+        lines += [
+            "  <entry>",
+            f"    <title>{escape(plain_text(info.title))}</title>",
+            f"    <id>{escape(url)}</id>",
+            f"    <link href={quoteattr(url)}/>",
+            f"    <updated>{_timestamp(info.updated)}</updated>",
+        ]
+        for tag in info.metadata.get("tags", ()):
+            lines.append(f"    <category term={quoteattr(tag)}/>")
+        if info.summary:
+            lines.append(f"    <summary>{escape(info.summary)}</summary>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    write_if_changed(os.path.join(dest_dir, FEED_NAME), "\n".join(lines) + "\n")
+    logger.info("Feed: %d entries from /%s", len(pages), section)
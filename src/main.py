@@ -1,40 +1,119 @@
 import os
-import sys
 import shutil
-from htmlnode import LeafNode, ParentNode, markdown_to_html_node
+import argparse
+import logging
+import time
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from htmlnode import (LeafNode, ParentNode, markdown_lines_to_document, markdown_stream_to_html_node, markdown_to_document,
+                      set_page_profile, set_render_cache)
 from textnode import TextNode, TextType
-from md_to_textnode import extract_title
+from sources import MarkdownSource
+from document import Document, PageInfo
+from template import Layouts, Template, page_values
+from urls import UrlResolver
+from render_cache import DEFAULT_CACHE_SIZE, RenderCache
+from profiling import BuildProfile, PageProfile, count_nodes
+from assets import LINK_MODES, fingerprint_assets, sync_directory
+from compress import precompress
+from linkcheck import LinkIndex, write_report
+from listings import DEFAULT_PAGE_SIZE, page_url, write_feed, write_section_indexes, write_sitemap
+from images import DEFAULT_WIDTHS, process_images
+from frontmatter import page_metadata
+from manifest import MANIFEST_NAME, BuildManifest, file_hash, remove_output
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+logger = logging.getLogger("ssg")
+
+# Sources at least this large are streamed block by block instead of being
+# read and converted whole
+STREAM_THRESHOLD = 8 << 20
+
+def generate_page(from_path, template_path, dest_path, basepath="/", template=None, profile=None, urls=None, minify=False,
+                  stream=None):
+    """
+    Renders one markdown page into dest_path and returns its Document.
+    """
+    logger.debug("Generating page from %s to %s using %s", from_path, dest_path, template_path)
     
     # Create any necessary directories for the destination path
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
     
-    # Read the markdown file
-    with open(from_path, 'r') as f:
-        markdown_content = f.read()
+    # Compile the template unless the caller already did for the whole build
+    if urls is None:
+        urls = UrlResolver(basepath)
+    if template is None:
+        template = Template.load(template_path, urls, minify)
     
-    # Read the template file
-    with open(template_path, 'r') as f:
-        template_content = f.read()
+    if profile is not None:
+        return _generate_page_profiled(from_path, dest_path, template, urls, profile)
     
-    # Convert markdown to HTML and get the title
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
-    title = extract_title(markdown_content)
+    # Large sources are streamed unless the caller chose a mode
+    if stream is None:
+        stream = os.path.getsize(from_path) >= STREAM_THRESHOLD
     
-    # Replace placeholders in the template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    # Stream the filled template into the destination file, replacing it
+    # only once the page rendered completely
+    tmp_path = dest_path + ".tmp"
+    try:
+        with MarkdownSource(from_path) as source, open(tmp_path, 'w', buffering=1 << 16) as f:
+            if stream:
+                # The title precedes the content in the template, so it is
+                # found first by scanning the mapped file, then blocks are
+                # converted as they are read
+                document = Document(None, source.title(), metadata=source.metadata)
+                html_node = markdown_stream_to_html_node(source.lines(), urls, document)
+                # The render cache is bounded by entry count, not size, and
+                # would keep every fragment of a huge page; streamed pages
+                # bypass it so memory stays bounded by the largest block
+                previous = set_render_cache(None)
+                try:
+                    template.write(f, **page_values(template, document.title, html_node, document.metadata))
+                finally:
+                    set_render_cache(previous)
+            else:
+                # Convert markdown to HTML, resolving link and image URLs
+                # against the basepath; the title comes from the same pass.
+                # Blocks are scanned straight from the mapped file's lines
+                document = markdown_lines_to_document(source.lines(), urls, source.metadata)
+                document.require_title()
+                template.write(f, **page_values(template, document.title, document.node, document.metadata))
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return document
+
+def _generate_page_profiled(from_path, dest_path, template, urls, profile):
+    # Same steps as generate_page, but each stage runs to completion on its
+    # own so it can be timed separately
+    with profile.timer("read"):
+        with MarkdownSource(from_path) as source:
+            markdown_content = source.text()
+            metadata = source.metadata
     
-    # Replace root paths with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
+    previous = set_page_profile(profile)
+    try:
+        start = time.perf_counter()
+        document = markdown_to_document(markdown_content, urls)
+        document.metadata = metadata
+        title = document.require_title()
+        html_node = document.node
+        elapsed = time.perf_counter() - start
+    finally:
+        set_page_profile(previous)
+    nested = profile.stages["blocks"] + profile.stages["inline"]
+    profile.add("convert", max(0.0, elapsed - nested))
+    profile.html_nodes += count_nodes(html_node)
     
-    # Write the final HTML to the destination file
-    with open(dest_path, 'w') as f:
-        f.write(final_html)
+    with profile.timer("to_html"):
+        html_content = html_node.to_html(template.minify)
+    with profile.timer("template"):
+        final_html = template.render(**page_values(template, title, html_content, metadata))
+    with profile.timer("write"):
+        with open(dest_path, 'w') as f:
+            f.write(final_html)
+    return document
 
 def copy_directory(src, dst):
     # First, remove the destination directory if it exists
@@ -53,52 +132,419 @@ def copy_directory(src, dst):
         # Create all subdirectories
         for dir_name in dirs:
             dst_dir = os.path.join(dst_root, dir_name)
-            print(f"Creating directory: {dst_dir}")
+            logger.debug("Creating directory: %s", dst_dir)
             os.makedirs(dst_dir, exist_ok=True)
         
         # Copy all files
         for file_name in files:
             src_file = os.path.join(root, file_name)
             dst_file = os.path.join(dst_root, file_name)
-            print(f"Copying file: {src_file} -> {dst_file}")
+            logger.debug("Copying file: %s -> %s", src_file, dst_file)
             shutil.copy2(src_file, dst_file)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def page_destination(src_file, dir_path_content, dest_dir_path, slug=None):
+    """
+    Returns the HTML output path for a markdown file in the content directory.
+    A slug from the front matter replaces the page's directory name for
+    index.md, and the file name otherwise.
+    """
+    # Calculate destination path:
+    # 1. Get the relative directory structure
+    # 2. Replace .md with .html
+    rel_path = os.path.relpath(os.path.dirname(src_file), dir_path_content)
+    file = os.path.basename(src_file)
+    dest_file_name = 'index.html' if file == 'index.md' else file.replace('.md', '.html')
+    if slug and file == 'index.md' and rel_path != os.curdir:
+        rel_path = os.path.join(os.path.dirname(rel_path), slug)
+    elif slug and file != 'index.md':
+        dest_file_name = slug + '.html'
+    return os.path.normpath(os.path.join(dest_dir_path, rel_path, dest_file_name))
+
+def find_pages(dir_path_content, dest_dir_path, drafts=False):
+    """
+    Yields (source, destination, metadata) for every markdown file in the
+    content directory. Only the front matter of each file is read; drafts
+    are skipped unless drafts is True.
+    """
     # Walk through all files and directories in the content directory
     for root, dirs, files in os.walk(dir_path_content):
-        # Calculate the relative path from content directory
-        rel_path = os.path.relpath(root, dir_path_content)
-        
         # For each markdown file
         for file in files:
             if file.endswith('.md'):
                 # Get the full source path of the markdown file
                 src_file = os.path.join(root, file)
-                
-                # Calculate destination path:
-                # 1. Get the relative directory structure
-                # 2. Replace .md with .html
-                dest_file_name = 'index.html' if file == 'index.md' else file.replace('.md', '.html')
-                dest_file = os.path.join(dest_dir_path, rel_path, dest_file_name)
-                
-                # Generate the HTML page with basepath
-                generate_page(src_file, template_path, dest_file, basepath)
-
-def main():
-    # Get basepath from command line argument or default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+                try:
+                    metadata = page_metadata(src_file)
+                except ValueError as e:
+                    raise ValueError(f"{src_file}: {e}")
+                if metadata.get("draft") and not drafts:
+                    logger.debug("Skipping draft %s", src_file)
+                    continue
+                yield src_file, page_destination(src_file, dir_path_content, dest_dir_path, metadata.get("slug")), metadata
+
+# What a page job reports back to the main process
+PageResult = namedtuple("PageResult", ["src_file", "error", "hits", "misses", "new_entries", "profile", "document"])
+
+_worker_build = None
+
+def _init_page_worker(template_path, urls, layouts, cache, profiling):
+    global _worker_build
+    _worker_build = (template_path, urls, layouts, cache, profiling)
+    set_render_cache(cache)
+
+def _generate_page_job(job):
+    # Runs in a worker process, so failures are returned instead of raised
+    src_file, dest_file, layout = job
+    template_path, urls, layouts, cache, profiling = _worker_build
+    hits, misses = cache.hits, cache.misses
+    profile = PageProfile(src_file) if profiling else None
+    error = None
+    document = None
+    try:
+        template = layouts.get(layout)
+        document = generate_page(src_file, template.files[0], dest_file, urls.basepath, template, profile, urls)
+        # Only the page's metadata goes back to the main process
+        document.node = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return PageResult(src_file, error, cache.hits - hits, cache.misses - misses, cache.take_new(), profile, document)
+
+def run_page_jobs(jobs, template_path, basepath="/", workers=1, cache=None, profile=None, urls=None, minify=False,
+                  layouts=None):
+    """
+    Generates every (source, destination, layout) job and returns two dicts
+    keyed by source path: error messages for the pages that failed, and the
+    Documents (without their node trees) of the pages that were written. The
+    layouts the jobs use are compiled once and handed to each worker when it
+    starts. Results are collected in job order, so reports are deterministic.
     
-    # Copy static directory to docs
-    static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
-    docs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "docs")
-    copy_directory(static_dir, docs_dir)
+    Workers start from a copy of cache and send back their new entries and
+    hit/miss counts, which are merged into it. With a BuildProfile, every
+    page is profiled and added to it. A UrlResolver carrying fingerprinted
+    asset names or image metadata takes the place of the plain basepath.
+    With minify, pages are written minified; a given cache must have been
+    made with the same setting.
+    """
+    if urls is None:
+        urls = UrlResolver(basepath)
+    if layouts is None:
+        layouts = Layouts(template_path, None, urls, minify)
+    for job in jobs:
+        layouts.get(job[2])
+    if cache is None:
+        cache = RenderCache(minify=minify)
+    profiling = profile is not None
+    if workers == 1 or len(jobs) <= 1:
+        previous = set_render_cache(cache)
+        try:
+            _init_page_worker(template_path, urls, layouts, cache, profiling)
+            results = list(map(_generate_page_job, jobs))
+        finally:
+            set_render_cache(previous)
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        initargs = (template_path, urls, layouts, cache.copy(track_new=True), profiling)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=initargs) as executor:
+            results = list(executor.map(_generate_page_job, jobs, chunksize=chunksize))
+            for result in results:
+                cache.merge(result.new_entries, result.hits, result.misses)
+    errors = {}
+    documents = {}
+    for result in results:
+        if result.error:
+            errors[result.src_file] = result.error
+            continue
+        documents[result.src_file] = result.document
+        if profiling:
+            profile.add(result.profile)
+    return errors, documents
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, workers=1, cache=None, profile=None, urls=None, minify=False,
+                             drafts=False, layouts=None):
+    """
+    Generates every page under dir_path_content and returns the site's
+    catalog: {source path: PageInfo} for all pages, including those an
+    incremental build skipped. Drafts are left out unless drafts is True.
+    Pages are rendered with the layout they select from layouts, or with the
+    template at template_path.
+    """
+    if urls is None:
+        urls = UrlResolver(basepath)
+    if layouts is None:
+        layouts = Layouts(template_path, None, urls, minify)
+    if manifest is not None:
+        # A different output mode, basepath, set of asset names or image
+        # metadata invalidates every page
+        options_key = urls.cache_key + (":min" if minify else "")
+        if manifest.options_key != options_key:
+            manifest.pages = {}
+        manifest.options_key = options_key
+        # Shared files edited since the last build invalidate their dependents
+        graph = manifest.graph
+        changed_files = graph.changed_files()
+        affected = graph.affected(changed_files)
+
+    seen = {}
+    jobs = []
+    rel_paths = {}
+    pages = {}
+    catalog = {}
+    for src_file, dest_file, metadata in sorted(find_pages(dir_path_content, dest_dir_path, drafts)):
+        rel_src = os.path.normpath(os.path.relpath(src_file, dir_path_content))
+        rel_dest = os.path.normpath(os.path.relpath(dest_file, dest_dir_path))
+        rel_paths[src_file] = (rel_src, rel_dest)
+        stat = os.stat(src_file)
+        pages[src_file] = (stat.st_mtime, metadata)
+        # A page depends on its layout and the partials that includes, in
+        # the sorted form the graph stores
+        layout = layouts.select(rel_src, metadata)
+        dependencies = sorted(set(layouts.get(layout).files))
+        if manifest is not None:
+            seen[rel_src] = src_file
+            # Unchanged pages are skipped on size and mtime alone, or after
+            # hashing if those changed
+            content_hash = None
+            fresh = rel_src not in affected and graph.dependencies.get(rel_src) == dependencies
+            if fresh and not manifest.stat_matches("pages", rel_src, stat, rel_dest, dest_dir_path):
+                content_hash = file_hash(src_file)
+                fresh = manifest.is_fresh("pages", rel_src, content_hash, rel_dest, dest_dir_path)
+            if fresh:
+                if content_hash is not None:
+                    # Touched but unchanged: remember the new mtime
+                    manifest.record("pages", rel_src, content_hash, rel_dest, stat)
+                entry = manifest.pages[rel_src]
+                catalog[rel_src] = page_info(rel_src, rel_dest, entry.get("title"), entry.get("summary"), stat.st_mtime,
+                                             entry.get("links", []), metadata, entry.get("anchors", []))
+                continue
+            previous = manifest.pages.get(rel_src)
+            if previous is not None and previous["output"] != rel_dest:
+                # The slug changed: the page moves to a new output
+                remove_output(os.path.join(dest_dir_path, previous["output"]), dest_dir_path)
+            manifest.record("pages", rel_src, content_hash or file_hash(src_file), rel_dest, stat)
+            graph.set_dependencies(rel_src, dependencies)
+        jobs.append((src_file, dest_file, layout))
+
+    errors, documents = run_page_jobs(jobs, template_path, urls.basepath, workers, cache, profile, urls, minify, layouts)
+
+    for src_file, document in documents.items():
+        rel_src, rel_dest = rel_paths[src_file]
+        mtime, metadata = pages[src_file]
+        anchors = [heading.id for heading in document.headings]
+        catalog[rel_src] = page_info(rel_src, rel_dest, document.title, document.summary, mtime, document.links, metadata,
+                                     anchors)
+        if manifest is not None:
+            # Kept so the catalog stays complete when the page is skipped
+            manifest.pages[rel_src].update(title=document.title, summary=document.summary,
+                                           links=[list(link) for link in document.links], anchors=anchors)
+
+    if manifest is not None:
+        # Failed pages are dropped so the next build retries them
+        for rel_src, src_file in seen.items():
+            if src_file in errors:
+                manifest.pages.pop(rel_src, None)
+        removed = manifest.prune("pages", seen, dest_dir_path)
+        for rel_src in removed:
+            graph.remove(rel_src)
+        graph.record_hashes(changed_files)
+        generated = len(jobs) - len(errors)
+        logger.info("Pages: %d generated, %d unchanged, %d removed", generated, len(seen) - len(jobs), len(removed))
+
+    if errors:
+        for src_file, error in errors.items():
+            logger.error("Failed to generate %s: %s", src_file, error)
+        raise RuntimeError(f"{len(errors)} of {len(jobs)} pages failed to generate")
+    return catalog
+
+def page_info(source, output, title, summary, mtime, links, metadata=None, anchors=()):
+    output = output.replace(os.sep, "/")
+    metadata = metadata or {}
+    return PageInfo(source.replace(os.sep, "/"), output, page_url(output), title, summary, metadata.get("date", mtime),
+                    [tuple(link) for link in links], metadata, list(anchors))
+
+def process_assets(args, static_dir, docs_dir, cache_dir, manifest=None):
+    """
+    Runs the optional asset stages (image variants, fingerprinting) on the
+    synced output and returns the UrlResolver pages are rendered with.
+    """
+    images = None
+    assets = None
+    if args.images:
+        widths = [int(width) for width in args.image_widths.split(",")]
+        images = process_images(static_dir, docs_dir, os.path.join(cache_dir, "images"), widths, args.link_mode, manifest)
+    if args.fingerprint:
+        assets = fingerprint_assets(static_dir, docs_dir, args.link_mode, manifest)
+    return UrlResolver(args.basepath, assets, images)
+
+def check_links(catalog, layouts, docs_dir, report_path, fail_on_broken=False):
+    """
+    Checks the links of every page in the catalog (and of the templates)
+    against the generated site and writes the JSON report.
+    """
+    link_index = LinkIndex()
+    for info in catalog.values():
+        link_index.add(info.source, info.output, info.links, info.anchors)
+    for path in layouts.sources():
+        source = os.path.relpath(path, os.path.dirname(layouts.default_path))
+        link_index.add(source, "index.html", Template.load(path).links)
+    report = link_index.check(docs_dir)
+    write_report(report, report_path)
+    broken = report["broken"]
+    for link in broken:
+        logger.warning("Broken %s in %s:%s: %s", link["kind"], link["source"], link["line"], link["url"])
+    logger.info("Links: %d checked, %d external, %d broken (report written to %s)", report["checked"], report["external"],
+                len(broken), report_path)
+    if broken and fail_on_broken:
+        raise RuntimeError(f"{len(broken)} broken links")
+
+def write_listings(args, catalog, layouts, docs_dir, urls):
+    """
+    Writes the section index pages, sitemap and feed that were asked for,
+    all from the catalog collected while the pages were rendered. Index
+    pages use their section's layout.
+    """
+    extra_urls = []
+    if args.section_index:
+        for section in args.section_index.split(","):
+            template = layouts.get(layouts.select(f"{section.strip('/')}/index.md"))
+            extra_urls += write_section_indexes(catalog, section, template, docs_dir, urls, args.page_size)
+    if args.site_url:
+        write_sitemap(catalog, docs_dir, args.site_url, extra_urls)
+        if args.feed_section:
+            write_feed(catalog, args.feed_section, docs_dir, args.site_url)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the static site from markdown content")
+    parser.add_argument("basepath", nargs="?", default="/", help="root path the site is served from")
+    parser.add_argument("--content", metavar="DIR", help="markdown content directory (default: content/)")
+    parser.add_argument("--static", metavar="DIR", help="static asset directory (default: static/)")
+    parser.add_argument("--template", metavar="PATH", help="page template (default: template.html)")
+    parser.add_argument("--layouts", metavar="DIR",
+                        help="directory of named layouts and partials/ (default: layouts/ next to the template)")
+    parser.add_argument("--output", metavar="DIR", help="output directory (default: docs/)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild pages and assets that changed since the last build")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto",
+                        help="how --incremental places static files: reflink, hardlink or copy (auto tries them in that order)")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also emit content-hashed copies of static assets and reference them from pages")
+    parser.add_argument("--images", action="store_true",
+                        help="generate resized image variants and emit srcset, width/height and lazy loading")
+    parser.add_argument("--image-widths", default=",".join(str(width) for width in DEFAULT_WIDTHS),
+                        help="comma-separated widths of the generated image variants")
+    parser.add_argument("--minify", action="store_true",
+                        help="write pages with insignificant whitespace, quotes and end tags removed")
+    parser.add_argument("--check-links", nargs="?", const="link-report.json", metavar="PATH",
+                        help="check internal links and asset references against the output and write a JSON report "
+                             "to PATH (default: link-report.json)")
+    parser.add_argument("--fail-on-broken-links", action="store_true",
+                        help="with --check-links, fail the build if any link is broken")
+    parser.add_argument("--drafts", action="store_true",
+                        help="also generate pages marked draft: true in their front matter")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="absolute URL the site is published at; enables sitemap.xml and the Atom feed")
+    parser.add_argument("--feed-section", default="blog", metavar="DIR",
+                        help="content section whose pages go in atom.xml (default: blog; empty for no feed)")
+    parser.add_argument("--section-index", metavar="DIRS",
+                        help="comma-separated content sections to generate paginated index pages for")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="number of pages listed on each section index page")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and .br if brotli is installed) siblings for text outputs")
+    parser.add_argument("--cache-dir", metavar="DIR", help="directory for cached build work (default: .cache/)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes for page generation (0 = one per CPU)")
+    parser.add_argument("--render-cache", metavar="PATH",
+                        help="load and save the rendered block cache at PATH between builds")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="maximum number of rendered blocks kept in the cache")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log every generated page and copied file")
+    parser.add_argument("--profile", nargs="?", const="profile.json", metavar="PATH",
+                        help="time each build stage per page and write a JSON report to PATH (default: profile.json)")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to list in the profile summary")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, serve the site and rebuild pages as sources change")
+    parser.add_argument("--port", type=int, default=8888, help="port for --watch to serve on")
+    parser.add_argument("--poll-interval", type=float, default=0.5,
+                        help="seconds between checks for changed sources in --watch mode")
+    args = parser.parse_args(argv)
+    if args.watch and args.fingerprint:
+        # Pages would keep pointing at the hashed names of the initial build
+        parser.error("--fingerprint cannot be used with --watch: edited assets would never be served")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    basepath = args.basepath
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    static_dir = args.static or os.path.join(root_dir, "static")
+    docs_dir = args.output or os.path.join(root_dir, "docs")
+    content_dir = args.content or os.path.join(root_dir, "content")
+    template_path = args.template or os.path.join(root_dir, "template.html")
+    cache_dir = args.cache_dir or os.path.join(root_dir, ".cache")
+    layouts_dir = args.layouts or os.path.join(os.path.dirname(os.path.abspath(template_path)), "layouts")
+    if not os.path.isdir(layouts_dir):
+        layouts_dir = None
+    
+    if args.render_cache:
+        cache = RenderCache.load(args.render_cache, args.cache_size, args.minify)
+    else:
+        cache = RenderCache(args.cache_size, minify=args.minify)
+    profile = BuildProfile() if args.profile else None
     
-    # Generate all pages from markdown to HTML
-    content_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "content")
-    template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "template.html")
+    urls = UrlResolver(basepath)
+    try:
+        if args.incremental or args.watch:
+            # Reuse everything the previous build recorded as up to date
+            manifest = BuildManifest.load(os.path.join(docs_dir, MANIFEST_NAME))
+            sync_directory(static_dir, docs_dir, manifest, args.link_mode)
+            urls = process_assets(args, static_dir, docs_dir, cache_dir, manifest)
+            layouts = Layouts(template_path, layouts_dir, urls, args.minify)
+            try:
+                catalog = generate_pages_recursive(content_dir, template_path, docs_dir, basepath, manifest, workers, cache,
+                                                   profile, urls, args.minify, args.drafts, layouts)
+            finally:
+                manifest.save()
+        else:
+            # Copy static directory to docs
+            copy_directory(static_dir, docs_dir)
+            urls = process_assets(args, static_dir, docs_dir, cache_dir)
+            layouts = Layouts(template_path, layouts_dir, urls, args.minify)
+            
+            # Generate all pages recursively with basepath
+            catalog = generate_pages_recursive(content_dir, template_path, docs_dir, basepath, workers=workers, cache=cache,
+                                               profile=profile, urls=urls, minify=args.minify, drafts=args.drafts,
+                                               layouts=layouts)
+        
+        write_listings(args, catalog, layouts, docs_dir, urls)
+        
+        if args.check_links:
+            check_links(catalog, layouts, docs_dir, args.check_links, args.fail_on_broken_links)
+        
+        if args.precompress:
+            precompress(docs_dir, workers)
+    finally:
+        logger.info(cache.summary())
+        if args.render_cache:
+            cache.save(args.render_cache)
+        if profile is not None:
+            profile.write(args.profile, args.profile_top)
+            logger.info(profile.summary(args.profile_top))
+            logger.info("Profile written to %s", args.profile)
     
-    # Generate all pages recursively with basepath
-    generate_pages_recursive(content_dir, template_path, docs_dir, basepath)
+    if args.watch:
+        # Imported here because the dev server builds on this module
+        from devserver import SiteWatcher, watch_and_serve
+        watcher = SiteWatcher(content_dir, static_dir, template_path, docs_dir, basepath, cache, urls, layouts_dir,
+                              args.drafts, manifest, catalog, partial(write_listings, args))
+        watch_and_serve(watcher, args.port, args.poll_interval)
 
 if __name__ == "__main__":
+    # Only the command line installs a handler, so callers of main() such as
+    # the tests keep control of logging. Summaries are logged at INFO,
+    # per-file messages at DEBUG
+    logging.basicConfig(level=logging.DEBUG if parse_args().verbose else logging.INFO, format="%(message)s")
     main()
\ No newline at end of file
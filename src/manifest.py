@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 5
+
+def file_hash(path):
+    """
+    Returns the sha256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def remove_output(path, root):
+    """
+    Deletes a generated file and any directories left empty by it, up to root.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    parent = os.path.dirname(path)
+    root = os.path.abspath(root)
+    while os.path.abspath(parent).startswith(root) and os.path.abspath(parent) != root:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+def write_if_changed(path, text):
+    """
+    Writes text to path unless the file already holds it, so unchanged
+    outputs keep their mtime (and their precompressed siblings).
+    """
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    return True
+
+class DependencyGraph():
+    """
+    Edges from each page to the shared files its output depends on (the
+    template now; layouts, partials and other pages' sources as pages start
+    using them), plus the hash each shared file had when its dependents were
+    last built.
+
+    The reverse edges are kept alongside, so the pages affected by a set of
+    changed files are found in time proportional to the number of edges
+    touched, not the size of the site.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.dependencies = {page: list(files) for page, files in data.get("dependencies", {}).items()}
+        self.hashes = dict(data.get("hashes", {}))
+        self.dependents = {}
+        for page, files in self.dependencies.items():
+            for path in files:
+                self.dependents.setdefault(path, set()).add(page)
+
+    def to_dict(self):
+        return {"dependencies": self.dependencies, "hashes": self.hashes}
+
+    def set_dependencies(self, page, files):
+        """
+        Replaces the recorded dependencies of page with files.
+        """
+        self.remove(page)
+        files = sorted(set(files))
+        self.dependencies[page] = files
+        for path in files:
+            self.dependents.setdefault(path, set()).add(page)
+
+    def remove(self, page):
+        for path in self.dependencies.pop(page, ()):
+            pages = self.dependents.get(path)
+            if pages is not None:
+                pages.discard(page)
+                if not pages:
+                    del self.dependents[path]
+                    self.hashes.pop(path, None)
+
+    def changed_files(self):
+        """
+        Returns {path: current hash} for the shared files whose content
+        differs from the recorded hash, hashing each file once. A file that
+        no longer exists maps to None.
+        """
+        changed = {}
+        for path in self.dependents:
+            try:
+                current = file_hash(path)
+            except OSError:
+                current = None
+            if current is None or current != self.hashes.get(path):
+                changed[path] = current
+        return changed
+
+    def affected(self, changed_files):
+        """
+        Returns the set of pages depending on any of changed_files.
+        """
+        pages = set()
+        for path in changed_files:
+            pages.update(self.dependents.get(path, ()))
+        return pages
+
+    def record_hashes(self, current=None):
+        """
+        Stores the hashes the dependents were just built against: current
+        (as returned by changed_files) plus those of newly added files.
+        """
+        current = current or {}
+        for path in self.dependents:
+            if path in current:
+                content_hash = current[path]
+            elif path in self.hashes:
+                continue
+            else:
+                content_hash = file_hash(path) if os.path.exists(path) else None
+            if content_hash is None:
+                self.hashes.pop(path, None)
+            else:
+                self.hashes[path] = content_hash
+
+class BuildManifest():
+    """
+    On-disk record of what the last build produced.
+
+    Pages and static assets are keyed by their path relative to the content or
+    static directory, and each entry stores the source content hash and the
+    output path relative to the destination directory. Page entries also
+    keep the links the page makes, graph records which shared files each
+    page was built from, and retired lists the fingerprinted asset copies
+    kept from the previous generation.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        data = data or {}
+        if data.get("version") != MANIFEST_VERSION:
+            data = {}
+        self.options_key = data.get("options_key")
+        self.pages = data.get("pages", {})
+        self.static = data.get("static", {})
+        self.graph = DependencyGraph(data.get("graph"))
+        self.retired = data.get("retired", [])
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        return cls(path, data)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "options_key": self.options_key,
+            "pages": self.pages,
+            "static": self.static,
+            "graph": self.graph.to_dict(),
+            "retired": self.retired,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, section, rel_path, content_hash, output, dest_root):
+        """
+        Returns True if an entry is recorded with the same hash and output path
+        and that output still exists on disk.
+        """
+        entry = getattr(self, section).get(rel_path)
+        if entry is None:
+            return False
+        if entry["hash"] != content_hash or entry["output"] != output:
+            return False
+        return os.path.exists(os.path.join(dest_root, output))
+
+    def stat_matches(self, section, rel_path, stat, output, dest_root):
+        """
+        Returns True if the entry was recorded with the same size and mtime as
+        stat, so the source can be treated as unchanged without hashing it.
+        """
+        entry = getattr(self, section).get(rel_path)
+        if entry is None or "mtime_ns" not in entry:
+            return False
+        if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return False
+        if entry["output"] != output:
+            return False
+        return os.path.exists(os.path.join(dest_root, output))
+
+    def record(self, section, rel_path, content_hash, output, stat=None):
+        """
+        Records a source's hash, output and (optionally) size and mtime.
+        Any other data stored on the entry, such as a page's links, is kept.
+        """
+        entry = getattr(self, section).get(rel_path, {})
+        entry.update(hash=content_hash, output=output)
+        entry.pop("size", None)
+        entry.pop("mtime_ns", None)
+        if stat is not None:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+        getattr(self, section)[rel_path] = entry
+
+    def prune(self, section, seen, dest_root):
+        """
+        Drops entries whose sources were not seen in this build and deletes
+        their outputs. Returns the list of removed source paths.
+        """
+        entries = getattr(self, section)
+        removed = [rel_path for rel_path in entries if rel_path not in seen]
+        live_outputs = {entries[rel_path]["output"] for rel_path in seen if rel_path in entries}
+        for rel_path in removed:
+            output = entries.pop(rel_path)["output"]
+            if output not in live_outputs:
+                remove_output(os.path.join(dest_root, output), dest_root)
+        return removed
@@ -1,3 +1,4 @@
+from collections import namedtuple
 from textnode import TextNode, TextType, BlockType
 import re
 
@@ -145,56 +146,174 @@ def split_nodes_link(old_nodes):
             
     return result
 
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+# Anything that can open an inline element: a delimiter, an image or a link
+INLINE_START_RE = re.compile(r"\*\*|[_`]|!?\[")
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_RE = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def text_to_textnodes(text: str) -> list[TextNode]:
     """
     Converts markdown text to a list of TextNodes.
+    Scans the text once from left to right, so the contents of a delimited
+    span (e.g. `code`) are never split again by the other delimiters.
     """
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Split nodes based on delimiters (e.g., * for bold)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = []
+    plain_start = 0
+    scan = 0
     
-    # Split nodes based on images and links
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    while True:
+        match = INLINE_START_RE.search(text, scan)
+        if match is None:
+            break
+        start = match.start()
+        token = match.group()
+        
+        if token in INLINE_DELIMITERS:
+            end = text.find(token, match.end())
+            if end == -1:
+                raise ValueError(f"Closing delimiter not found: {token}")
+            if start > plain_start:
+                nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+            nodes.append(TextNode(text[match.end():end], INLINE_DELIMITERS[token]))
+            plain_start = scan = end + len(token)
+            continue
+        
+        # Images and links; a "[" that doesn't form one stays plain text
+        if token == "![":
+            element = IMAGE_RE.match(text, start)
+            text_type = TextType.IMAGE
+        else:
+            element = LINK_RE.match(text, start)
+            text_type = TextType.LINK
+        if element is None:
+            scan = match.end()
+            continue
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+        nodes.append(TextNode(element.group(1), text_type, url=element.group(2)))
+        plain_start = scan = element.end()
     
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], TextType.TEXT))
     return nodes
 
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+FENCE = "```"
+
+class Block(namedtuple("Block", ["type", "text", "lines", "start", "end"])):
+    """
+    A typed markdown block. text and lines have the block's surrounding
+    whitespace stripped; start and end are the [start, end) span of source
+    lines it was read from.
+    """
+    __slots__ = ()
+
+def _is_fence_open(line):
+    # An info string may follow the fence, but not one containing backticks
+    return line.startswith(FENCE) and FENCE[0] not in line[3:]
+
+def _trimmed_block(lines, start, end):
+    # Same result as "\n".join(lines).strip(): leading whitespace-only lines
+    # are never collected, so only the trailing ones need dropping
+    while not lines[-1].strip():
+        lines.pop()
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return Block(lines_to_block_type(lines), "\n".join(lines), lines, start, end)
+
+def scan_blocks(markdown: str):
+    """
+    Walks markdown once, line by line, and yields a Block for every block.
+    Blocks are separated by empty lines, except inside a fenced code block,
+    which runs from its opening fence to the closing one.
+    """
+    return scan_block_lines(markdown.split("\n"))
+
+def scan_block_lines(lines):
+    """
+    scan_blocks over any iterable of lines without their line endings, so a
+    document can be read lazily.
+    """
+    block_lines = []
+    start = 0
+    fenced = False
+    index = -1
+    for index, line in enumerate(lines):
+        if fenced:
+            if line.strip() == FENCE:
+                block_lines.append(line.rstrip())
+                yield Block(BlockType.CODE, "\n".join(block_lines), block_lines, start, index + 1)
+                block_lines = []
+                fenced = False
+            else:
+                block_lines.append(line)
+            continue
+        if not line:
+            if block_lines:
+                yield _trimmed_block(block_lines, start, index)
+                block_lines = []
+            continue
+        if not block_lines:
+            stripped = line.lstrip()
+            if not stripped:
+                # Whitespace-only lines before a block are stripped with it
+                continue
+            start = index
+            if _is_fence_open(stripped):
+                block_lines = [stripped]
+                fenced = True
+                continue
+        block_lines.append(line)
+    if fenced:
+        # An unclosed fence runs to the end of the document
+        while len(block_lines) > 1 and not block_lines[-1].strip():
+            block_lines.pop()
+        yield Block(BlockType.CODE, "\n".join(block_lines), block_lines, start, index + 1)
+    elif block_lines:
+        yield _trimmed_block(block_lines, start, index + 1)
+
+def as_block(block):
+    """
+    Returns block as a Block. A string (such as one from markdown_to_blocks)
+    is typed with block_to_block_type, so converters still accept it.
+    """
+    if isinstance(block, Block):
+        return block
+    text = block.strip()
+    lines = text.split("\n")
+    return Block(block_to_block_type(text), text, lines, 0, len(lines))
+
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
     Converts markdown text to a list of blocks.
     Each block is separated by one or more empty lines.
     Returns a list of non-empty blocks with whitespace stripped.
     """
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
-            continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
-
-def block_to_block_type(block: str) -> BlockType:
-    lines = block.split("\n")
+    return [block.text for block in scan_blocks(markdown)]
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+def lines_to_block_type(lines: list[str]) -> BlockType:
+    """
+    Types a non-fenced block from its (already stripped) lines.
+    """
+    first = lines[0]
+    if first.startswith(HEADING_PREFIXES):
         return BlockType.HEADING
-    if block.startswith("```") and block.rstrip().endswith("```"):
-        return BlockType.CODE
-    if block.startswith(">"):
+    if first.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
-    if block.startswith("- "):
+    if first.startswith("- "):
         for line in lines:
             if not line.startswith("- "):
                 return BlockType.PARAGRAPH
         return BlockType.UNORDERED_LIST
-    if block.startswith("1. "):
+    if first.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -203,6 +322,39 @@ def block_to_block_type(block: str) -> BlockType:
         return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
+def block_to_block_type(block: str) -> BlockType:
+    if block.startswith("```") and block.rstrip().endswith("```"):
+        return BlockType.CODE
+    return lines_to_block_type(block.split("\n"))
+
+# The first line that is "# " plus some text once surrounding whitespace is
+# stripped, for extract_title
+TITLE_PATTERN = r"^[ \t\r\f\v]*# ([^\n]*\S)"
+TITLE_RE = re.compile(TITLE_PATTERN, re.M)
+
+# Characters a heading id keeps besides letters and digits
+ANCHOR_DROP_RE = re.compile(r"[^\w\- ]")
+
+def heading_id(text):
+    """
+    Returns the anchor id of a heading: its plain text lowercased, with
+    punctuation dropped and spaces turned into hyphens, as GitHub derives
+    heading anchors.
+    """
+    plain = "".join([node.text for node in text_to_textnodes(text) if node.text_type != TextType.IMAGE])
+    return ANCHOR_DROP_RE.sub("", plain.strip().lower()).replace(" ", "-")
+
+def first_title(blocks):
+    """
+    Returns the text of the first h1 heading block, or None. This is the
+    title markdown_to_document records, so "# " lines inside code blocks or
+    paragraphs never count.
+    """
+    for block in blocks:
+        if block.type == BlockType.HEADING and block.lines[0].startswith("# "):
+            return block.lines[0][2:].strip()
+    return None
+
 def extract_title(markdown: str) -> str:
     """
     Extracts the first h1 header (line starting with single #) from markdown text.
@@ -212,10 +364,7 @@ def extract_title(markdown: str) -> str:
     if not markdown:
         raise ValueError("Markdown content is empty")
     
-    lines = markdown.strip().split('\n')
-    for line in lines:
-        line = line.strip()
-        if line.startswith('# ') and not line.startswith('## '):  # Make sure it's h1 not h2 or higher
-            return line[2:].strip()
-            
-    raise ValueError("No h1 header (# ) found in markdown content")
\ No newline at end of file
+    match = TITLE_RE.search(markdown)
+    if match is None:
+        raise ValueError("No h1 header (# ) found in markdown content")
+    return match.group(1).strip()
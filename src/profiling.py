@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# "convert" is the part of markdown_to_html_node not covered by the block
+# scanning (which also types each block) and inline parsing stages, i.e.
+# building the node tree
+STAGES = ("read", "blocks", "inline", "convert", "to_html", "template", "write")
+
+class PageProfile():
+    """
+    Wall time per build stage and node counts for a single page.
+    """
+    __slots__ = ("path", "stages", "text_nodes", "html_nodes")
+
+    def __init__(self, path):
+        self.path = path
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.text_nodes = 0
+        self.html_nodes = 0
+
+    def add(self, stage, seconds):
+        self.stages[stage] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] += time.perf_counter() - start
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "total": self.total,
+            "stages": self.stages,
+            "text_nodes": self.text_nodes,
+            "html_nodes": self.html_nodes,
+        }
+
+class BuildProfile():
+    """
+    Collects the PageProfiles of a build and reports on them.
+    """
+
+    def __init__(self):
+        self.pages = []
+
+    def add(self, page):
+        self.pages.append(page)
+
+    def report(self, top=10):
+        totals = dict.fromkeys(STAGES, 0.0)
+        for page in self.pages:
+            for stage, seconds in page.stages.items():
+                totals[stage] += seconds
+        slowest = sorted(self.pages, key=lambda page: page.total, reverse=True)[:top]
+        return {
+            "pages": len(self.pages),
+            "total": sum(totals.values()),
+            "stages": totals,
+            "text_nodes": sum(page.text_nodes for page in self.pages),
+            "html_nodes": sum(page.html_nodes for page in self.pages),
+            "slowest": [page.to_dict() for page in slowest],
+            "all_pages": [page.to_dict() for page in self.pages],
+        }
+
+    def write(self, path, top=10):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(top), f, indent=1)
+
+    def summary(self, top=10):
+        report = self.report(top)
+        lines = [f"Profiled {report['pages']} pages in {report['total'] * 1000:.1f} ms "
+                 f"({report['text_nodes']} text nodes, {report['html_nodes']} HTML nodes)"]
+        for stage, seconds in report["stages"].items():
+            lines.append(f"  {stage:<11} {seconds * 1000:10.1f} ms")
+        lines.append(f"Slowest {len(report['slowest'])} pages:")
+        for page in report["slowest"]:
+            lines.append(f"  {page['total'] * 1000:10.1f} ms  {page['path']}")
+        return "\n".join(lines)
+
+def count_nodes(node):
+    """
+    Returns the number of HTMLNodes in a tree.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
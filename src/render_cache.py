@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+
+class RenderCache():
+    """
+    LRU-bounded map of markdown block -> [rendered HTML fragment, links],
+    where links are the (kind, url) pairs the block contains.
+
+    Keys are digests of the block text plus a variant string for anything
+    else the rendering depends on (e.g. the basepath links resolve against).
+    With track_new set, entries added since the last take_new() call are
+    remembered, so worker processes can hand them back to the main process.
+    A cache made with minify holds minified fragments.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, track_new=False, minify=False):
+        self.maxsize = maxsize
+        self.minify = minify
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.new_entries = {} if track_new else None
+
+    @staticmethod
+    def key(block, variant=""):
+        digest = hashlib.blake2b(variant.encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(block.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        fragment = self.entries.get(key)
+        if fragment is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        self.entries[key] = fragment
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        if self.new_entries is not None:
+            self.new_entries[key] = fragment
+
+    def take_new(self):
+        new_entries = self.new_entries or {}
+        if self.new_entries is not None:
+            self.new_entries = {}
+        return new_entries
+
+    def merge(self, new_entries, hits=0, misses=0):
+        for key, fragment in new_entries.items():
+            self.put(key, fragment)
+        self.hits += hits
+        self.misses += misses
+
+    def copy(self, track_new=False):
+        cache = RenderCache(self.maxsize, track_new, self.minify)
+        cache.entries = OrderedDict(self.entries)
+        return cache
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0
+        return f"Render cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.entries)} entries"
+
+    @classmethod
+    def load(cls, path, maxsize=DEFAULT_CACHE_SIZE, minify=False):
+        cache = cls(maxsize, minify=minify)
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        for key, entry in entries.items():
+            # Caches saved before links were recorded hold bare fragments
+            if isinstance(entry, list):
+                cache.put(key, entry)
+        return cache
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, path)
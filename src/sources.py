@@ -0,0 +1,79 @@
+import mmap
+import os
+from frontmatter import read_front_matter
+from md_to_textnode import first_title, scan_block_lines
+
+class MarkdownSource():
+    """
+    A markdown file opened through a read-only memory map.
+
+    The text is decoded straight from the mapping, so the file is never
+    copied into a separate read buffer first. Line endings are normalized
+    as text mode would.
+
+    Front matter is parsed when the file is opened and kept as metadata; the
+    text and lines have its lines blanked out, so line numbers still match
+    the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        # Empty files cannot be mapped
+        if os.fstat(self.file.fileno()).st_size:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = b""
+        self.has_cr = self.buffer.find(b"\r") != -1
+        self.metadata, self.header_lines = read_front_matter(self.buffer) if self.buffer else ({}, 0)
+        self.body_offset = self.buffer.tell() if self.header_lines else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+    def title(self):
+        """
+        Returns the first h1 heading, found by scanning blocks (without
+        converting them) up to it, so it matches the title of the whole
+        document.
+        """
+        title = first_title(scan_block_lines(self.lines()))
+        if title is None:
+            raise ValueError("No h1 header (# ) found in markdown content")
+        return title
+
+    def text(self):
+        if self.header_lines:
+            text = "\n" * self.header_lines + str(self.buffer[self.body_offset:], "utf-8")
+        else:
+            text = str(self.buffer, "utf-8")
+        if self.has_cr:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def lines(self):
+        """
+        Yields the lines of the file without their line endings, decoding
+        one line at a time.
+        """
+        yield from [""] * self.header_lines
+        if self.buffer:
+            self.buffer.seek(self.body_offset)
+        for raw in iter(self.buffer.readline, b"") if self.buffer else ():
+            line = str(raw, "utf-8")
+            if self.has_cr:
+                line = line.replace("\r\n", "\n").replace("\r", "\n")
+            if line.endswith("\n"):
+                line = line[:-1]
+            if self.has_cr:
+                yield from line.split("\n")
+            else:
+                yield line
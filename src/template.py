@@ -0,0 +1,222 @@
+import hashlib
+import os
+import re
+from datetime import datetime, timezone
+from document import Link
+from htmlnode import HTML_SPACE, WHITESPACE_RE
+from urls import UrlResolver
+
+SLOT_RE = re.compile(r"(\{\{\s*\w+\s*\}\})")
+PARTIAL_RE = re.compile(r"\{\{>\s*([\w/-]+)\s*\}\}")
+URL_ATTR_RE = re.compile(r'\b((?:href|src)=")([^"]*)(")')
+PRESERVE_RE = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+BLOCK_TAG_RE = re.compile(
+    HTML_SPACE + r"*(<!doctype[^>]*>|</?(?:html|head|body|title|meta|link|base|main|header|footer|nav|article|section|aside"
+    r"|div|p|h[1-6]|ul|ol|li|blockquote|pre|table|thead|tbody|tr|th|td|form|hr|br|figure|figcaption)\b[^>]*>)" + HTML_SPACE + "*",
+    re.I,
+)
+TAG_RE = re.compile(r"<[a-zA-Z][^>]*>")
+QUOTED_ATTR_RE = re.compile(r"""(\s[\w:-]+)=(["'])([^\s"'=<>`]+)\2""")
+VOID_CLOSE_RE = re.compile(HTML_SPACE + r"*/>$")
+
+def _minify_tag(match):
+    tag = VOID_CLOSE_RE.sub(">", match.group(0))
+    return QUOTED_ATTR_RE.sub(r"\1=\3", tag)
+
+def minify_markup(text):
+    """
+    Minifies literal template markup: whitespace around block-level tags is
+    removed, other runs of whitespace become one space, and attribute quotes
+    and void-element slashes are dropped. <pre>, <textarea>, <script> and
+    <style> elements are left untouched.
+    """
+    pieces = []
+    position = 0
+    for match in PRESERVE_RE.finditer(text):
+        pieces.append(_minify_text(text[position:match.start()]))
+        pieces.append(match.group(0))
+        position = match.end()
+    pieces.append(_minify_text(text[position:]))
+    return "".join(pieces)
+
+def _minify_text(text):
+    text = BLOCK_TAG_RE.sub(r"\1", WHITESPACE_RE.sub(" ", text))
+    return TAG_RE.sub(_minify_tag, text)
+
+class Template():
+    """
+    A page template parsed once into literal segments and named slots.
+
+    Root-relative href/src attributes in the literal segments are resolved
+    when the template is compiled, so rendering a page is a single join.
+    A minify template also minifies its literal markup once, up front, and
+    serializes node values in minified form.
+    """
+
+    def __init__(self, source, urls=None, minify=False, files=()):
+        if urls is None:
+            urls = UrlResolver()
+        parts = SLOT_RE.split(source)
+        # href/src URLs as written, for the link checker
+        self.links = [
+            Link("link", match.group(2), source.count("\n", 0, match.start()) + 1)
+            for match in URL_ATTR_RE.finditer(source)
+        ]
+        # Even positions are literal text, odd positions are "{{ Name }}" slots
+        for i in range(0, len(parts), 2):
+            parts[i] = URL_ATTR_RE.sub(lambda m: m.group(1) + urls(m.group(2)) + m.group(3), parts[i])
+            if minify:
+                parts[i] = minify_markup(parts[i])
+        self.minify = minify
+        # The files the template was compiled from, layout first
+        self.files = list(files)
+        self.parts = parts
+        self.placeholders = parts[1::2]
+        self.slots = [placeholder[2:-2].strip() for placeholder in self.placeholders]
+
+    @classmethod
+    def load(cls, path, urls=None, minify=False):
+        with open(path, 'r') as f:
+            return cls(f.read(), urls, minify)
+
+    def render(self, **values):
+        """
+        Fills every slot from values. Slots without a value keep their
+        placeholder text.
+        """
+        parts = list(self.parts)
+        parts[1::2] = [
+            values.get(name, placeholder)
+            for name, placeholder in zip(self.slots, self.placeholders)
+        ]
+        return "".join(parts)
+
+    def write(self, fp, **values):
+        """
+        Streams the filled template into fp. A value may be a string or an
+        HTMLNode, which is serialized fragment by fragment.
+        """
+        write = fp.write
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                write(part)
+                continue
+            value = values.get(self.slots[i // 2], part)
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.write_html(fp, self.minify)
+
+def page_values(template, title, content, metadata=None):
+    """
+    Returns the slot values for a page: Title and Content, plus every front
+    matter key with its first letter capitalized ({{ Date }}, {{ Tags }}).
+    Slots the page has no value for are left empty.
+    """
+    values = dict.fromkeys(template.slots, "")
+    for key, value in (metadata or {}).items():
+        if key == "date":
+            value = datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d")
+        elif isinstance(value, list):
+            value = ", ".join([str(item) for item in value])
+        values[key[:1].upper() + key[1:]] = str(value)
+    values["Title"] = title
+    values["Content"] = content
+    return values
+
+# Compiled templates shared by every Layouts of this process, keyed by the
+# path and content hash of each file a template was built from
+_compiled = {}
+
+class Layouts():
+    """
+    The templates a build renders pages with: the default template, plus
+    named layouts in layouts_dir (layouts/post.html is "post"). A page uses
+    the layout named by its layout front matter key, else the layout named
+    after its top-level section if there is one, else the default template.
+
+    "{{> name }}" includes layouts_dir/partials/name.html; partials are
+    inlined when a layout is compiled, so rendering stays a single pass over
+    precompiled segments. Each layout is compiled once per build and reused
+    across builds while none of its files change.
+    """
+
+    def __init__(self, default_path, layouts_dir=None, urls=None, minify=False):
+        self.default_path = os.path.abspath(default_path)
+        self.layouts_dir = os.path.abspath(layouts_dir) if layouts_dir else None
+        self.urls = urls if urls is not None else UrlResolver()
+        self.minify = minify
+        self.templates = {}
+
+    def path(self, name):
+        if name is None:
+            return self.default_path
+        return os.path.join(self.layouts_dir or "", name + ".html")
+
+    def select(self, rel_src, metadata=None):
+        """
+        Returns the layout name for a page (None for the default template).
+        """
+        name = (metadata or {}).get("layout")
+        if name is not None:
+            if self.layouts_dir is None or not os.path.isfile(self.path(name)):
+                raise ValueError(f"{rel_src}: unknown layout {name!r}")
+            return name
+        section = rel_src.replace(os.sep, "/").split("/", 1)
+        if len(section) > 1 and self.layouts_dir is not None and os.path.isfile(self.path(section[0])):
+            return section[0]
+        return None
+
+    def get(self, name=None):
+        """
+        Returns the compiled Template for a layout.
+        """
+        template = self.templates.get(name)
+        if template is None:
+            template = self.templates[name] = self._compile(self.path(name))
+        return template
+
+    def _read(self, path, sources, including=()):
+        # Reads a file and, depth first, every partial it includes
+        if path in including:
+            raise ValueError(f"Partial includes itself: {path}")
+        with open(path, 'r') as f:
+            source = f.read()
+        sources[path] = source
+        for name in PARTIAL_RE.findall(source):
+            partial = self._partial_path(name)
+            if partial not in sources or partial in including:
+                self._read(partial, sources, including + (path,))
+        return source
+
+    def _partial_path(self, name):
+        if self.layouts_dir is None:
+            raise ValueError(f"Partial {name!r} used without a layouts directory")
+        return os.path.join(self.layouts_dir, "partials", name + ".html")
+
+    def _expand(self, source, sources):
+        return PARTIAL_RE.sub(lambda m: self._expand(sources[self._partial_path(m.group(1))], sources), source)
+
+    def _compile(self, path):
+        sources = {}
+        source = self._read(path, sources)
+        key = (
+            tuple((file, hashlib.sha256(text.encode()).hexdigest()) for file, text in sources.items()),
+            self.urls.cache_key,
+            self.minify,
+        )
+        template = _compiled.get(key)
+        if template is None:
+            template = _compiled[key] = Template(self._expand(source, sources), self.urls, self.minify, sources)
+        return template
+
+    def sources(self):
+        """
+        Returns the paths of the default template and of every layout and
+        partial file.
+        """
+        paths = [self.default_path]
+        if self.layouts_dir is not None:
+            for root, dirs, files in os.walk(self.layouts_dir):
+                paths += sorted(os.path.join(root, file) for file in files if file.endswith(".html"))
+        return paths
@@ -0,0 +1,101 @@
+import json
+import os
+import unittest
+from assets import fingerprint_assets, fingerprinted_name, place_file, sync_directory
+from test_support import TempDirTestCase
+from manifest import BuildManifest
+
+class TestSyncDirectory(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dst = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+        self.manifest = BuildManifest(os.path.join(self.dst, ".build-manifest.json"))
+
+    def test_hardlink(self):
+        src_file = os.path.join(self.src, "index.css")
+        dst_file = os.path.join(self.dst, "index.css")
+        self.assertEqual(place_file(src_file, dst_file, "hardlink"), "hardlink")
+        self.assertTrue(os.path.samefile(src_file, dst_file))
+
+    def test_replaces_without_writing_through_links(self):
+        src_file = os.path.join(self.src, "index.css")
+        dst_file = os.path.join(self.dst, "index.css")
+        place_file(src_file, dst_file, "hardlink")
+        other = os.path.join(self.src, "images", "a.png")
+        place_file(other, dst_file, "copy")
+        self.assertEqual(self.read(src_file), "body {}")
+
+    def test_unchanged_files_are_left_alone(self):
+        sync_directory(self.src, self.dst, self.manifest, "copy")
+        dst_file = os.path.join(self.dst, "index.css")
+        os.utime(dst_file, (0, 0))
+        # Touched but identical content is not copied again
+        os.utime(os.path.join(self.src, "index.css"))
+        sync_directory(self.src, self.dst, self.manifest, "copy")
+        self.assertEqual(os.path.getmtime(dst_file), 0)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        sync_directory(self.src, self.dst, self.manifest, "copy")
+        self.assertNotEqual(os.path.getmtime(dst_file), 0)
+
+    def test_prunes_deleted_files_only(self):
+        sync_directory(self.src, self.dst, self.manifest)
+        self.write(os.path.join(self.dst, "index.html"), "page")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        sync_directory(self.src, self.dst, self.manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.css")))
+
+class TestFingerprintAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dst = os.path.join(self.root, "docs")
+        self.css = self.write(os.path.join(self.src, "index.css"), "body {}")
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("css/index.css", "0123456789abcdef"), "css/index.0123456789.css")
+
+    def test_mapping_and_manifest(self):
+        assets = fingerprint_assets(self.src, self.dst)
+        hashed = assets["/index.css"]
+        self.assertRegex(hashed, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertTrue(os.path.exists(os.path.join(self.dst, hashed[1:])))
+        with open(os.path.join(self.dst, "asset-manifest.json")) as f:
+            self.assertEqual(json.load(f), {"index.css": hashed[1:]})
+
+    def test_changed_asset_replaces_old_hash(self):
+        old = fingerprint_assets(self.src, self.dst)["/index.css"]
+        self.write(self.css, "body { color: red }")
+        new = fingerprint_assets(self.src, self.dst)["/index.css"]
+        self.assertNotEqual(old, new)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, old[1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, new[1:])))
+
+    def test_previous_generation_is_kept_for_one_build(self):
+        manifest = BuildManifest(os.path.join(self.dst, ".build-manifest.json"))
+        old = fingerprint_assets(self.src, self.dst, manifest=manifest)["/index.css"]
+        self.write(self.css, "body { color: red }")
+        new = fingerprint_assets(self.src, self.dst, manifest=manifest)["/index.css"]
+        self.assertTrue(os.path.exists(os.path.join(self.dst, old[1:])))
+        fingerprint_assets(self.src, self.dst, manifest=manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, old[1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, new[1:])))
+
+    def test_hashed_copies_are_never_hardlinked(self):
+        for link_mode in ("auto", "hardlink"):
+            hashed = fingerprint_assets(self.src, os.path.join(self.root, link_mode), link_mode)["/index.css"]
+            self.assertFalse(os.path.samefile(self.css, os.path.join(self.root, link_mode, hashed[1:])))
+
+    def test_unchanged_manifest_is_not_rewritten(self):
+        fingerprint_assets(self.src, self.dst)
+        manifest_path = os.path.join(self.dst, "asset-manifest.json")
+        os.utime(manifest_path, (0, 0))
+        fingerprint_assets(self.src, self.dst)
+        self.assertEqual(os.path.getmtime(manifest_path), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import gzip
+import os
+import unittest
+from compress import brotli, precompress
+from test_support import TempDirTestCase
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dst = self.root
+        self.write("index.html", "<p>hello</p>" * 100)
+        self.write(os.path.join("blog", "index.html"), "<p>blog</p>")
+        self.write("index.css", "body {}")
+        self.write("photo.png", "png")
+
+    def test_writes_gzip_siblings_for_text_files(self):
+        precompress(self.dst)
+        with gzip.open(os.path.join(self.dst, "index.html.gz"), 'rt') as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "blog", "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "photo.png.gz")))
+        self.assertEqual(os.path.exists(os.path.join(self.dst, "index.html.br")), brotli is not None)
+
+    def test_output_is_deterministic(self):
+        precompress(self.dst)
+        with open(os.path.join(self.dst, "index.html.gz"), 'rb') as f:
+            first = f.read()
+        os.remove(os.path.join(self.dst, "index.html.gz"))
+        precompress(self.dst)
+        with open(os.path.join(self.dst, "index.html.gz"), 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+    def test_skips_up_to_date_siblings(self):
+        per_file = 2 if brotli is not None else 1
+        self.assertEqual(precompress(self.dst, workers=2), 3 * per_file)
+        self.assertEqual(precompress(self.dst, workers=2), 0)
+        self.write("index.css", "body { margin: 0; }")
+        self.assertEqual(precompress(self.dst), per_file)
+        with gzip.open(os.path.join(self.dst, "index.css.gz"), 'rt') as f:
+            self.assertEqual(f.read(), "body { margin: 0; }")
+
+    def test_removes_orphaned_siblings(self):
+        precompress(self.dst)
+        os.remove(os.path.join(self.dst, "blog", "index.html"))
+        precompress(self.dst)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "blog", "index.html.gz")))
+
+    def test_keeps_published_archives(self):
+        self.write(os.path.join("dl", "release.tar.gz"), "archive")
+        self.write(os.path.join("dl", "notes.br"), "archive")
+        precompress(self.dst)
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "dl", "release.tar.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "dl", "notes.br")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import unittest
+from functools import partial
+from devserver import SiteWatcher, diff_snapshots
+from test_support import TempDirTestCase
+from main import generate_pages_recursive, main, parse_args, write_listings
+from manifest import MANIFEST_NAME, BuildManifest
+
+class TestSiteWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "other.md"), "# Other")
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest)
+
+    def write(self, path, text):
+        path = super().write(path, text)
+        # Make sure the change is visible even on coarse mtime clocks
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        return path
+
+    def read(self, name):
+        return super().read(os.path.join(self.dest, name))
+
+    def test_diff_snapshots(self):
+        changed, removed = diff_snapshots({"a": (1, 1), "b": (1, 1)}, {"a": (2, 1), "c": (1, 1)})
+        self.assertEqual((changed, removed), (["a", "c"], ["b"]))
+
+    def test_rebuilds_only_touched_page(self):
+        self.write(os.path.join(self.content, "index.md"), "# Edited")
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertIn("<title>Edited</title>", self.read("index.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "other.html")))
+        self.assertEqual(self.watcher.poll(), 0)
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+        self.assertEqual(self.watcher.poll(), 2)
+        self.assertEqual(self.read("other.html"), "<h1>Other</h1>")
+
+    def test_layout_change_rebuilds_pages(self):
+        layouts = os.path.join(self.root, "layouts")
+        self.write(os.path.join(self.content, "post.md"), "---\nlayout: post\n---\n# Post")
+        self.write(os.path.join(layouts, "post.html"), "<h2>{{ Title }}</h2>")
+        watcher = SiteWatcher(self.content, self.static, self.template, self.dest, layouts_dir=layouts)
+        self.write(os.path.join(layouts, "post.html"), "<h3>{{ Title }}</h3>")
+        self.assertEqual(watcher.poll(), 3)
+        self.assertEqual(self.read("post.html"), "<h3>Post</h3>")
+        self.assertEqual(self.read("other.html"), '<title>Other</title><div><h1 id="other">Other</h1></div>')
+
+    def test_drafts(self):
+        draft = os.path.join(self.content, "draft.md")
+        self.write(draft, "---\ndraft: true\n---\n# Draft")
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "draft.html")))
+        watcher = SiteWatcher(self.content, self.static, self.template, self.dest, drafts=True)
+        self.write(draft, "---\ndraft: true\n---\n# Edited draft")
+        self.assertEqual(watcher.poll(), 1)
+        self.assertIn("<title>Edited draft</title>", self.read("draft.html"))
+
+    def test_slug_and_draft_changes_remove_old_outputs(self):
+        page = os.path.join(self.content, "page.md")
+        self.write(page, "---\nslug: pretty\n---\n# Page")
+        self.watcher.poll()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "pretty.html")))
+        self.write(page, "---\nslug: prettier\n---\n# Page")
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "pretty.html")))
+        self.write(page, "---\nslug: prettier\ndraft: true\n---\n# Page")
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "prettier.html")))
+        self.write(page, "---\nslug: prettiest\n---\n# Page")
+        self.watcher.poll()
+        os.remove(page)
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "prettiest.html")))
+
+    def test_removing_a_slugged_page_built_before_watching(self):
+        page = os.path.join(self.content, "page.md")
+        self.write(page, "---\nslug: pretty\n---\n# Page")
+        watcher = SiteWatcher(self.content, self.static, self.template, self.dest)
+        self.write(os.path.join(self.dest, "pretty.html"), "built")
+        os.remove(page)
+        self.assertEqual(watcher.poll(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "pretty.html")))
+
+    def test_static_and_removed_files(self):
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.watcher.poll()
+        self.assertEqual(self.read("index.css"), "body {}")
+        os.remove(os.path.join(self.static, "index.css"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_vanished_static_file_is_skipped(self):
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        swap = os.path.join(self.static, ".index.css.swp")
+        with self.assertLogs("ssg", "ERROR"):
+            self.assertEqual(self.watcher.apply([swap, os.path.join(self.static, "index.css")], []), 1)
+        self.assertEqual(self.read("index.css"), "body {}")
+
+    def test_manifest_and_listings_follow_rebuilds(self):
+        argv = ["--content", self.content, "--static", self.static, "--template", self.template, "--output", self.dest,
+                "--incremental", "--site-url", "https://example.com"]
+        main(argv)
+        manifest = BuildManifest.load(os.path.join(self.dest, MANIFEST_NAME))
+        catalog = generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest)
+        watcher = SiteWatcher(self.content, self.static, self.template, self.dest, manifest=manifest, catalog=catalog,
+                              listings=partial(write_listings, parse_args(argv)))
+        self.write(os.path.join(self.content, "new.md"), "# New")
+        watcher.poll()
+        self.assertIn("https://example.com/new.html", self.read("sitemap.xml"))
+        self.assertIn("new.md", BuildManifest.load(os.path.join(self.dest, MANIFEST_NAME)).pages)
+        # The next incremental build finds the page up to date
+        os.utime(os.path.join(self.dest, "new.html"), (0, 0))
+        main(argv)
+        self.assertEqual(os.path.getmtime(os.path.join(self.dest, "new.html")), 0)
+        os.remove(os.path.join(self.content, "other.md"))
+        watcher.poll()
+        self.assertNotIn("other.html", self.read("sitemap.xml"))
+        self.assertNotIn("other.md", BuildManifest.load(os.path.join(self.dest, MANIFEST_NAME)).pages)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import unittest
+from contextlib import contextmanager
+import frontmatter
+from frontmatter import normalize, parse_front_matter, parse_simple, read_front_matter, split_front_matter
+
+HEADER = "date: 2024-03-01\ndraft: yes\ntags: [elves, lore]\nslug: /glorfindel/\nlayout: post"
+INVALID = ("- a list", "date: not a date", "key: [unclosed", "key: {a: 1")
+
+@contextmanager
+def without_parsers():
+    # The fallback parser, as used when PyYAML and tomllib are missing
+    previous = frontmatter.yaml, frontmatter.tomllib
+    frontmatter.yaml = frontmatter.tomllib = None
+    try:
+        yield
+    finally:
+        frontmatter.yaml, frontmatter.tomllib = previous
+
+class TestFrontMatter(unittest.TestCase):
+    def check_header(self, metadata):
+        self.assertEqual(metadata["date"], 1709251200.0)
+        self.assertEqual(metadata["tags"], ["elves", "lore"])
+        self.assertEqual((metadata["slug"], metadata["layout"]), ("glorfindel", "post"))
+        self.assertIs(metadata["draft"], True)
+
+    @unittest.skipUnless(frontmatter.yaml, "PyYAML is not installed")
+    def test_yaml(self):
+        self.check_header(parse_front_matter(HEADER))
+
+    @unittest.skipUnless(frontmatter.yaml, "PyYAML is not installed")
+    def test_yaml_invalid(self):
+        for header in INVALID:
+            with self.assertRaises(ValueError):
+                parse_front_matter(header)
+
+    @unittest.skipUnless(frontmatter.tomllib, "tomllib is not available")
+    def test_toml(self):
+        metadata = parse_front_matter('date = 2024-03-01T12:00:00Z\ndraft = false\ntags = ["a", "b"]', "+++")
+        self.assertEqual(metadata, {"date": 1709294400.0, "draft": False, "tags": ["a", "b"]})
+
+    def test_fallback_reads_the_same_header(self):
+        with without_parsers():
+            self.check_header(parse_front_matter(HEADER))
+            for value, draft in (("on", True), ("No", False), ("OFF", False), ("true", True)):
+                self.assertIs(parse_front_matter(f"draft: {value}")["draft"], draft)
+
+    def test_fallback_invalid(self):
+        with without_parsers():
+            for header in INVALID + ("key: unclosed]",):
+                with self.assertRaises(ValueError):
+                    parse_front_matter(header)
+
+    def test_simple_fallback(self):
+        header = '# comment\ndate: 2024-03-01\ndraft: true\ntitle: "Quoted: text"\ntags:\n  - elves\n  - lore'
+        self.assertEqual(parse_simple(header), {"date": "2024-03-01", "draft": True, "title": "Quoted: text",
+                                                "tags": ["elves", "lore"]})
+        self.assertEqual(parse_simple("tags = [a, 'b']"), {"tags": ["a", "b"]})
+
+    def test_simple_fallback_without_parsers(self):
+        with without_parsers():
+            self.assertEqual(parse_front_matter("date: 2024-03-01\ntags: a, b")["tags"], ["a", "b"])
+            self.assertEqual(parse_front_matter('date = "2024-03-01"', "+++")["date"], 1709251200.0)
+
+    def test_read_header_only(self):
+        f = io.BytesIO(b"---\r\ntags: [a]\r\n---\r\n# Title\n")
+        self.assertEqual(read_front_matter(f), ({"tags": ["a"]}, 3))
+        self.assertEqual(f.read(), b"# Title\n")
+        f = io.BytesIO(b"# Title\n---\n")
+        self.assertEqual(read_front_matter(f), ({}, 0))
+        self.assertEqual(f.tell(), 0)
+        with self.assertRaises(ValueError):
+            read_front_matter(io.BytesIO(b"+++\ndraft = true\n"))
+
+    def test_slug_and_layout_stay_in_their_directory(self):
+        self.assertEqual(normalize({"slug": "/pretty/", "layout": "post"}), {"slug": "pretty", "layout": "post"})
+        for metadata in ({"slug": "../../../tmp/evil"}, {"slug": ".."}, {"slug": "a\\b"}, {"layout": "../post"},
+                         {"layout": "partials/nav"}):
+            with self.assertRaises(ValueError):
+                normalize(metadata)
+
+    def test_split_keeps_line_numbers(self):
+        metadata, markdown = split_front_matter("---\nslug: x\n---\n# Title\n\ntext")
+        self.assertEqual(metadata, {"slug": "x"})
+        self.assertEqual(markdown, "\n\n\n# Title\n\ntext")
+        self.assertEqual(split_front_matter("# Title\n---"), ({}, "# Title\n---"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import struct
+import unittest
+import zlib
+import images
+from test_support import TempDirTestCase
+from images import process_images, read_image_size
+from urls import UrlResolver
+from htmlnode import markdown_to_html_node
+
+def write_png(path, width, height):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + b"\x80\x40\x20" * width for _ in range(height))
+    with open(path, 'wb') as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows)))
+        f.write(chunk(b"IEND", b""))
+
+class TestImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dst = os.path.join(self.root, "docs")
+        self.cache = os.path.join(self.root, "cache")
+        os.makedirs(os.path.join(self.src, "images"))
+        write_png(os.path.join(self.src, "images", "a.png"), 600, 20)
+
+    def test_read_image_size(self):
+        self.assertEqual(read_image_size(os.path.join(self.src, "images", "a.png")), (600, 20))
+        gif = os.path.join(self.root, "a.gif")
+        with open(gif, 'wb') as f:
+            f.write(b"GIF89a" + struct.pack("<HH", 7, 9) + b"\x00" * 10)
+        self.assertEqual(read_image_size(gif), (7, 9))
+        jpeg = os.path.join(self.root, "a.jpg")
+        with open(jpeg, 'wb') as f:
+            f.write(b"\xff\xd8\xff\xe0\x00\x04ab\xff\xc0\x00\x11\x08" + struct.pack(">HH", 30, 40) + b"\x00" * 12)
+        self.assertEqual(read_image_size(jpeg), (40, 30))
+
+    def test_metadata_is_cached_by_hash(self):
+        first = process_images(self.src, self.dst, self.cache, (480,))
+        self.assertEqual(first["/images/a.png"]["width"], 600)
+        self.assertEqual(first["/images/a.png"]["height"], 20)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+        self.assertEqual(process_images(self.src, self.dst, self.cache, (480,)), first)
+
+    def test_unchanged_manifest_is_not_rewritten(self):
+        process_images(self.src, self.dst, self.cache, (480,))
+        manifest_path = os.path.join(self.dst, "image-manifest.json")
+        os.utime(manifest_path, (0, 0))
+        process_images(self.src, self.dst, self.cache, (480,))
+        self.assertEqual(os.path.getmtime(manifest_path), 0)
+
+    @unittest.skipIf(images.Image is None, "Pillow is not installed")
+    def test_variants(self):
+        result = process_images(self.src, self.dst, self.cache, (300, 480))
+        variants = result["/images/a.png"]["variants"]
+        self.assertEqual([width for _, width in variants], [300, 480, 600])
+        for url, width in variants:
+            self.assertTrue(os.path.exists(os.path.join(self.dst, url[1:])))
+
+    def test_image_attributes(self):
+        info = {"/images/a.png": {"width": 600, "height": 20, "variants": [["/images/a.1.300w.png", 300], ["/images/a.1.600w.png", 600]]},
+                "/images/b.png": {"width": 10, "height": 10, "variants": []}}
+        urls = UrlResolver("/site/", images=info)
+        html = markdown_to_html_node("![a](/images/a.png)", urls).to_html()
+        self.assertEqual(
+            html,
+            '<div><p><img src="/site/images/a.1.600w.png" alt="a" width="600" height="20" '
+            'srcset="/site/images/a.1.300w.png 300w, /site/images/a.1.600w.png 600w" loading="lazy"></img></p></div>',
+        )
+        # Without variants the original file stays the source
+        html = markdown_to_html_node("![b](/images/b.png)", urls).to_html()
+        self.assertIn('src="/site/images/b.png"', html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import unittest
+from test_support import TempDirTestCase
+from linkcheck import LinkIndex
+from main import main
+
+class TestLinkIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.root
+        for path in ("index.html", "blog/tom/index.html", "images/tom.png", "index.css"):
+            self.write(path, "x")
+
+    def test_check(self):
+        index = LinkIndex()
+        index.add("index.md", "index.html", [
+            ("link", "/blog/tom", 3),
+            ("link", "/blog/tom/", 3),
+            ("link", "/blog/tom#history", 4),
+            ("image", "/images/tom.png?v=2", 5),
+            ("link", "/blog/missing", 6),
+            ("link", "https://example.com/", 7),
+            ("link", "#top", 8),
+            ("link", "#missing", 9),
+            ("link", "/blog/tom/#missing", 10),
+            ("image", "/index.css#anything", 11),
+        ], ["top"])
+        index.add("blog/tom/index.md", "blog/tom/index.html", [
+            ("image", "../../images/tom.png", 1),
+            ("image", "tom.png", 2),
+            ("link", "/", 3),
+            ("link", "../../#top", 4),
+        ], ["history"])
+        report = index.check(self.dest)
+        self.assertEqual((report["pages"], report["checked"], report["external"]), (2, 13, 1))
+        self.assertEqual(
+            [(link["source"], link["line"], link["url"]) for link in report["broken"]],
+            [("blog/tom/index.md", 2, "tom.png"), ("index.md", 6, "/blog/missing"), ("index.md", 9, "#missing"),
+             ("index.md", 10, "/blog/tom/#missing")],
+        )
+
+class TestCheckLinksBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = self.write("template.html", '<link href="/index.css" rel="stylesheet" />{{ Content }}')
+        self.report = os.path.join(self.root, "links.json")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog) and [gone](/gone)")
+        self.write(os.path.join(self.content, "blog", "index.md"),
+                   "# Blog\n\n[Home](/#home), [Posts](#the-posts) and [Top](#top)\n\n## The posts")
+
+    def build(self, *extra):
+        main(["--content", self.content, "--static", self.static, "--template", self.template,
+              "--output", self.docs, "--check-links", self.report, *extra])
+        return json.loads(self.read(self.report))
+
+    def test_incremental_build_keeps_links_of_skipped_pages(self):
+        for _ in range(2):
+            report = self.build("--incremental")
+            self.assertEqual([link["url"] for link in report["broken"]], ["#top", "/gone"])
+            self.assertEqual(report["checked"], 6)
+        self.assertIn('<h2 id="the-posts">The posts</h2>', self.read("docs/blog/index.html"))
+
+    def test_fail_on_broken(self):
+        with self.assertRaises(RuntimeError):
+            self.build("--fail-on-broken-links")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+from test_support import TempDirTestCase
+from listings import page_url, section_pages
+from main import main, page_info
+
+class TestListings(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom")
+        self.assertEqual(page_url("notes.html"), "/notes.html")
+
+    def test_section_pages_newest_first(self):
+        catalog = {}
+        for source, output, updated in (("index.md", "index.html", 5), ("blog/index.md", "blog/index.html", 9),
+                                        ("blog/a.md", "blog/a.html", 1), ("blog/b.md", "blog/b.html", 3),
+                                        ("blog/c/index.md", "blog/c/index.html", 3)):
+            catalog[source] = page_info(source, output, source, None, updated, [])
+        self.assertEqual([info.url for info in section_pages(catalog, "blog")],
+                         ["/blog/b.html", "/blog/c", "/blog/a.html"])
+
+class TestListingsBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        os.makedirs(self.static)
+        self.write("content/index.md", "# Fan **Club**\n\nHome page.", 100)
+        for i in range(5):
+            self.write(f"content/blog/post-{i}.md", f"# Post {i}\n\n[Back](/)\n\nAbout <{i}> & more.", 1000 + i)
+
+    def build(self, *extra):
+        main(["--content", self.content, "--static", self.static, "--template", self.template, "--output", self.docs,
+              "--site-url", "https://example.com/site/", "--section-index", "blog", "--page-size", "2", *extra])
+
+    def test_sitemap_feed_and_indexes(self):
+        self.build()
+        sitemap = self.read("docs/sitemap.xml")
+        self.assertIn("<loc>https://example.com/site/</loc><lastmod>1970-01-01T00:01:40Z</lastmod>", sitemap)
+        self.assertIn("<loc>https://example.com/site/blog/post-3.html</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/site/blog/page/3</loc>", sitemap)
+        feed = self.read("docs/atom.xml")
+        self.assertIn("<title>Fan Club</title>", feed)
+        self.assertIn("<summary>About &lt;4&gt; &amp; more.</summary>", feed)
+        self.assertLess(feed.index("post-4.html"), feed.index("post-0.html"))
+        first = self.read("docs/blog/index.html")
+        self.assertTrue(first.startswith("<title>Blog</title>"))
+        self.assertIn('<a href="/blog/post-4.html">Post 4</a>', first)
+        self.assertIn('<a href="/blog/page/2" rel="next">Older</a>', first)
+        self.assertNotIn("post-2.html", first)
+        last = self.read("docs/blog/page/3/index.html")
+        self.assertIn("/blog/post-0.html", last)
+        self.assertIn('<a href="/blog/page/2" rel="prev">Newer</a>', last)
+
+    def test_incremental_build_keeps_catalog_and_removes_stale_indexes(self):
+        self.build("--incremental")
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "blog", "page", "3", "index.html")))
+        for i in range(2, 5):
+            os.remove(os.path.join(self.content, "blog", f"post-{i}.md"))
+        self.build("--incremental")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "page", "2")))
+        # Both remaining posts were skipped; their entries come from the manifest
+        first = self.read("docs/blog/index.html")
+        self.assertIn('<a href="/blog/post-1.html">Post 1</a>', first)
+        self.assertIn("<p>About <0> & more.</p>", first)
+        self.assertNotIn("rel=\"next\"", first)
+
+    def test_front_matter_date_and_tags(self):
+        self.write("content/blog/post-0.md", "---\ndate: 2030-01-01\ntags: [elves]\n---\n# Post 0", 1)
+        self.build()
+        feed = self.read("docs/atom.xml")
+        self.assertLess(feed.index("post-0.html"), feed.index("post-4.html"))
+        self.assertIn('<updated>2030-01-01T00:00:00Z</updated>\n    <category term="elves"/>', feed)
+
+    def test_section_layout_slots_without_values_are_empty(self):
+        self.write("layouts/blog.html", "<title>{{ Title }}</title><p>{{ Date }}|{{ Tags }}</p>{{ Content }}")
+        self.build("--layouts", os.path.join(self.root, "layouts"))
+        self.assertTrue(self.read("docs/blog/index.html").startswith("<title>Blog</title><p>|</p><div>"))
+
+    def test_content_index_keeps_its_url(self):
+        self.write("content/blog/index.md", "# My Blog", 1)
+        self.build()
+        self.assertIn("<title>My Blog</title>", self.read("docs/blog/index.html"))
+        self.assertIn("Post 4", self.read("docs/blog/page/1/index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stderr
+from test_support import TempDirTestCase
+from main import generate_page, generate_pages_recursive, parse_args
+from htmlnode import set_render_cache
+from manifest import BuildManifest
+from render_cache import RenderCache
+
+class TestGeneratePagesParallel(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(6):
+            self.write(f"content/page{i}.md", f"# Page {i}\n\nSome **text** here")
+
+    def test_parallel_matches_serial(self):
+        generate_pages_recursive(self.content, self.template, self.dest, workers=1)
+        serial = [self.read(f"docs/page{i}.html") for i in range(6)]
+        generate_pages_recursive(self.content, self.template, self.dest, workers=3)
+        parallel = [self.read(f"docs/page{i}.html") for i in range(6)]
+        self.assertEqual(serial, parallel)
+
+    def test_errors_reported_per_page(self):
+        self.write("content/broken.md", "no title here")
+        with self.assertRaises(RuntimeError) as context:
+            generate_pages_recursive(self.content, self.template, self.dest, workers=2)
+        self.assertIn("1 of 7 pages failed", str(context.exception))
+        self.assertIn("<title>Page 5</title>", self.read("docs/page5.html"))
+
+class TestParseArgs(unittest.TestCase):
+    def test_watch_refuses_fingerprinting(self):
+        self.assertTrue(parse_args(["--watch"]).watch)
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            parse_args(["--watch", "--fingerprint"])
+
+class TestStreamingPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", "<title>{{ Title }}</title>\n<body>{{ Content }}</body>")
+        self.source = self.write("page.md",
+                                 "Intro [home](/)\n\n# The Title\n\n```\ncode\n\n  more\n```\n\n- a\n- b\n\n> quote\n")
+
+    def render(self, name, **options):
+        generate_page(self.source, self.template, os.path.join(self.root, name), "/site/", **options)
+        return self.read(name)
+
+    def test_streaming_matches_whole_document(self):
+        streamed = self.render("streamed.html", stream=True)
+        self.assertEqual(streamed, self.render("whole.html", stream=False))
+        self.assertIn("<title>The Title</title>", streamed)
+        self.assertIn('<a href="/site/">home</a>', streamed)
+        self.assertEqual(
+            self.render("streamed.min.html", stream=True, minify=True),
+            self.render("whole.min.html", stream=False, minify=True),
+        )
+
+    def test_streaming_title_matches_whole_document(self):
+        cases = (
+            ("Intro\n# not heading\n\n```\n# install\n```\n\n## Sub\n\n# Real\n", "Real"),
+            ("```sh\n# install\n```\n\nNo title\n", None),
+        )
+        for markdown, title in cases:
+            self.write(self.source, markdown)
+            for stream in (True, False):
+                if title is None:
+                    with self.assertRaises(ValueError):
+                        self.render("page.html", stream=stream)
+                else:
+                    self.assertIn(f"<title>{title}</title>", self.render("page.html", stream=stream))
+
+    def test_streaming_bypasses_render_cache(self):
+        cache = RenderCache()
+        previous = set_render_cache(cache)
+        try:
+            self.render("streamed.html", stream=True)
+            self.assertEqual((cache.hits, cache.misses, len(cache.entries)), (0, 0, 0))
+            self.render("whole.html", stream=False)
+            self.assertGreater(len(cache.entries), 0)
+        finally:
+            set_render_cache(previous)
+
+    def test_streaming_without_title_fails(self):
+        self.write(self.source, "no title\n")
+        with self.assertRaises(ValueError):
+            self.render("page.html", stream=True)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "page.html.tmp")))
+
+class TestFrontMatterPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/tom/index.md",
+                   "---\nslug: tom-bombadil\ndate: 2024-01-02\ntags: [lore]\n---\n# Tom\n\nText")
+        self.write("content/blog/draft.md", "+++\ndraft = true\n+++\n# Draft")
+
+    def exists(self, path):
+        return os.path.exists(os.path.join(self.dest, path))
+
+    def test_drafts_and_slugs(self):
+        catalog = generate_pages_recursive(self.content, self.template, self.dest)
+        self.assertEqual(sorted(catalog), ["blog/tom/index.md", "index.md"])
+        self.assertFalse(self.exists("blog/draft.html"))
+        self.assertFalse(self.exists("blog/tom/index.html"))
+        info = catalog["blog/tom/index.md"]
+        self.assertEqual((info.output, info.url, info.updated), ("blog/tom-bombadil/index.html", "/blog/tom-bombadil", 1704153600.0))
+        self.assertEqual(info.metadata["tags"], ["lore"])
+        catalog = generate_pages_recursive(self.content, self.template, self.dest, drafts=True)
+        self.assertIn("blog/draft.md", catalog)
+        self.assertTrue(self.exists("blog/draft.html"))
+
+    def test_incremental_slug_and_draft_changes(self):
+        manifest = BuildManifest(os.path.join(self.dest, "manifest.json"))
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.write("content/blog/tom/index.md", "---\nslug: tom\n---\n# Tom")
+        self.write("content/index.md", "---\ndraft: true\n---\n# Home")
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertTrue(self.exists("blog/tom/index.html"))
+        self.assertFalse(self.exists("blog/tom-bombadil"))
+        self.assertFalse(self.exists("index.html"))
+
+    def test_streaming_keeps_metadata(self):
+        source = os.path.join(self.content, "blog/tom/index.md")
+        documents = [generate_page(source, self.template, os.path.join(self.dest, f"{stream}.html"), stream=stream)
+                     for stream in (True, False)]
+        self.assertEqual(documents[0].metadata, documents[1].metadata)
+        self.assertEqual(documents[0].metadata["slug"], "tom-bombadil")
+        self.assertEqual(self.read("docs/True.html"), self.read("docs/False.html"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import unittest
+from test_support import TempDirTestCase
+from manifest import BuildManifest, DependencyGraph, file_hash
+from main import generate_pages_recursive, sync_directory
+from template import Layouts
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.manifest_path = os.path.join(self.dest, ".build-manifest.json")
+
+    def build(self, layouts_dir=None):
+        manifest = BuildManifest.load(self.manifest_path)
+        sync_directory(self.static, self.dest, manifest)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest,
+                                 layouts=Layouts(self.template, layouts_dir))
+        manifest.save()
+        return manifest
+
+    def test_round_trip(self):
+        manifest = self.build()
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        self.assertEqual(loaded.static["index.css"]["hash"], file_hash(os.path.join(self.static, "index.css")))
+
+    def test_only_changed_pages_regenerated(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        post_html = os.path.join(self.dest, "blog", "post.html")
+        os.utime(index_html, (0, 0))
+        os.utime(post_html, (0, 0))
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        self.build()
+        self.assertEqual(os.path.getmtime(index_html), 0)
+        self.assertNotEqual(os.path.getmtime(post_html), 0)
+        self.assertIn("<title>Edited</title>", self.read(post_html))
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertNotEqual(os.path.getmtime(index_html), 0)
+
+    def test_touched_but_unchanged_page_is_skipped(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        os.utime(os.path.join(self.content, "index.md"), (1, 1))
+        manifest = self.build()
+        self.assertEqual(os.path.getmtime(index_html), 0)
+        self.assertEqual(manifest.pages["index.md"]["mtime_ns"], 1_000_000_000)
+
+    def test_graph_persisted_with_template_dependency(self):
+        self.build()
+        graph = BuildManifest.load(self.manifest_path).graph
+        template = os.path.abspath(self.template)
+        self.assertEqual(graph.dependencies["index.md"], [template])
+        self.assertEqual(graph.affected([template]), {"index.md", os.path.join("blog", "post.md")})
+        self.assertEqual(graph.hashes[template], file_hash(self.template))
+        self.assertEqual(graph.changed_files(), {})
+
+    def test_layout_and_partial_changes_rebuild_their_pages(self):
+        layouts = os.path.join(self.root, "layouts")
+        self.write(os.path.join(layouts, "blog.html"), "{{> nav }}{{ Content }}")
+        self.write(os.path.join(layouts, "partials", "nav.html"), "<nav>v1</nav>")
+        self.build(layouts)
+        graph = BuildManifest.load(self.manifest_path).graph
+        post = os.path.join("blog", "post.md")
+        self.assertEqual(graph.dependencies[post], sorted([os.path.join(layouts, "blog.html"),
+                                                           os.path.join(layouts, "partials", "nav.html")]))
+        index_html = os.path.join(self.dest, "index.html")
+        post_html = os.path.join(self.dest, "blog", "post.html")
+        os.utime(index_html, (0, 0))
+        self.write(os.path.join(layouts, "partials", "nav.html"), "<nav>v2</nav>")
+        self.build(layouts)
+        self.assertEqual(os.path.getmtime(index_html), 0)
+        self.assertEqual(self.read(post_html), "<nav>v2</nav><div><h1 id=\"post\">Post</h1></div>")
+        # Selecting another layout changes the page's dependencies
+        self.write(os.path.join(self.content, "index.md"), "---\nlayout: blog\n---\n# Home")
+        self.build(layouts)
+        self.assertTrue(self.read(index_html).startswith("<nav>v2</nav>"))
+
+    def test_partial_sorting_before_its_layout_keeps_pages_fresh(self):
+        layouts = os.path.join(self.root, "layouts")
+        self.write(os.path.join(layouts, "post.html"), "{{ Content }}{{> footer }}")
+        self.write(os.path.join(layouts, "partials", "footer.html"), "<footer></footer>")
+        self.write(os.path.join(self.content, "index.md"), "---\nlayout: post\n---\n# Home")
+        self.build(layouts)
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        self.build(layouts)
+        self.assertEqual(os.path.getmtime(index_html), 0)
+
+    def test_removed_sources_are_pruned(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        manifest = self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertNotIn(os.path.join("blog", "post.md"), manifest.pages)
+
+class TestDependencyGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.layout = self.write("layout.html", "layout")
+        self.partial = self.write("nav.html", "nav")
+
+    def test_only_dependents_of_changed_files_are_affected(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("a.md", [self.layout, self.partial])
+        graph.set_dependencies("b.md", [self.layout])
+        graph.record_hashes()
+        self.assertEqual(graph.changed_files(), {})
+        self.write(self.partial, "changed")
+        changed = graph.changed_files()
+        self.assertEqual(list(changed), [self.partial])
+        self.assertEqual(graph.affected(changed), {"a.md"})
+        graph.record_hashes(changed)
+        self.assertEqual(graph.changed_files(), {})
+
+    def test_round_trip_and_remove(self):
+        graph = DependencyGraph()
+        graph.set_dependencies("a.md", [self.partial])
+        graph.set_dependencies("a.md", [self.layout])
+        graph.record_hashes()
+        loaded = DependencyGraph(graph.to_dict())
+        self.assertEqual(loaded.affected([self.partial]), set())
+        self.assertEqual(loaded.affected([self.layout]), {"a.md"})
+        loaded.remove("a.md")
+        self.assertEqual(loaded.to_dict(), {"dependencies": {}, "hashes": {}})
+
+if __name__ == "__main__":
+    unittest.main()
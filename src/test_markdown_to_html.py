@@ -1,5 +1,9 @@
 import unittest
-from htmlnode import markdown_to_html_node
+from htmlnode import (block_to_html_node, code_to_html_node, heading_to_html_node, markdown_to_document,
+                      markdown_to_html_node, paragraph_to_html_node, quote_to_html_node, set_render_cache,
+                      ulist_to_html_node)
+from md_to_textnode import markdown_to_blocks
+from render_cache import RenderCache
 
 class TestMarkdownToHTML(unittest.TestCase):
     def test_paragraphs(self):
@@ -34,5 +38,85 @@ class TestMarkdownToHTML(unittest.TestCase):
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nfirst\n\n  second\n```\n\nAfter"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>first\n\n  second\n</code></pre><p>After</p></div>")
+
+    def test_document_title_and_headings(self):
+        md = "```\n# not a heading\n```\n\n## Intro\n\n# The **Title**\n\ntext\n\n### Details"
+        for cache in (None, RenderCache()):
+            previous = set_render_cache(cache)
+            try:
+                document = markdown_to_document(md)
+            finally:
+                set_render_cache(previous)
+            self.assertEqual(document.title, "The **Title**")
+            self.assertEqual(
+                [tuple(heading) for heading in document.headings],
+                [(2, "Intro", 5, "intro"), (1, "The **Title**", 7, "the-title"), (3, "Details", 11, "details")],
+            )
+            self.assertEqual(document.node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_heading_ids(self):
+        md = "## What's new in [v2](/v2)?\n\n## Ünïcode & `code_span`\n\n## A  -  B"
+        document = markdown_to_document(md)
+        self.assertEqual([heading.id for heading in document.headings],
+                         ["whats-new-in-v2", "ünïcode--code_span", "a-----b"])
+
+    def test_repeated_headings_get_numbered_ids(self):
+        md = "## Notes\n\n## Notes\n\n## Notes 1\n\n## Notes-1\n\n## Notes"
+        for cache in (None, RenderCache()):
+            previous = set_render_cache(cache)
+            try:
+                document = markdown_to_document(md)
+            finally:
+                set_render_cache(previous)
+            ids = ["notes", "notes-1", "notes-1-1", "notes-1-2", "notes-2"]
+            self.assertEqual([heading.id for heading in document.headings], ids)
+            self.assertEqual(document.node.to_html(), "<div>" + "".join(
+                f'<h2 id="{anchor}">{heading.text}</h2>' for anchor, heading in zip(ids, document.headings)) + "</div>")
+
+    def test_document_links(self):
+        md = "# T\n\nSee [a](/a) and ![img](/i.png)\n\n`[not](/code)`\n\nSee [a](/a) and ![img](/i.png)"
+        cache = RenderCache()
+        previous = set_render_cache(cache)
+        try:
+            document = markdown_to_document(md)
+        finally:
+            set_render_cache(previous)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(
+            [tuple(link) for link in document.links],
+            [("link", "/a", 3), ("image", "/i.png", 3), ("link", "/a", 7), ("image", "/i.png", 7)],
+        )
+
+    def test_block_converters_accept_strings(self):
+        md = "## Sub\n\nSome **bold**\ntext\n\n```\n  code\n```\n\n- a\n- b\n\n> quote"
+        self.assertEqual("".join(block_to_html_node(block).to_html() for block in markdown_to_blocks(md)),
+                         markdown_to_html_node(md).to_html()[5:-6])
+        self.assertEqual(paragraph_to_html_node("Some **bold**\ntext").to_html(), "<p>Some <b>bold</b> text</p>")
+        self.assertEqual(heading_to_html_node("### H").to_html(), "<h3 id=\"h\">H</h3>")
+        self.assertEqual(code_to_html_node("```\ncode\n```").to_html(), "<pre><code>code\n</code></pre>")
+        self.assertEqual(ulist_to_html_node("- a\n- b").to_html(), "<ul><li>a</li><li>b</li></ul>")
+        self.assertEqual(quote_to_html_node("> q").to_html(), "<blockquote>q</blockquote>")
+
+    def test_document_summary(self):
+        md = "# T\n\n[< Back](/)\n\n![img](/i.png)\n\n> quote\n\nFirst **real**\nparagraph, see [docs](/d).\n\nSecond."
+        self.assertEqual(markdown_to_document(md).summary, "First real paragraph, see docs.")
+        self.assertIsNone(markdown_to_document("# T\n\n- item").summary)
+
+    def test_document_front_matter(self):
+        document = markdown_to_document("---\ndraft: true\n---\n# Title\n\n[a](/a)")
+        self.assertEqual(document.metadata, {"draft": True})
+        self.assertEqual(document.title, "Title")
+        self.assertEqual([tuple(link) for link in document.links], [("link", "/a", 6)])
+
+    def test_document_without_title(self):
+        document = markdown_to_document("## Only a subheading")
+        self.assertIsNone(document.title)
+        with self.assertRaises(ValueError):
+            document.require_title()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
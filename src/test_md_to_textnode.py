@@ -3,9 +3,9 @@ from md_to_textnode import split_nodes_delimiter, text_to_textnodes
 from md_to_textnode import extract_markdown_images
 from md_to_textnode import extract_markdown_links
 from md_to_textnode import split_nodes_image
-from md_to_textnode import markdown_to_blocks
+from md_to_textnode import markdown_to_blocks, scan_blocks
 from md_to_textnode import extract_title
-from textnode import TextNode, TextType
+from textnode import BlockType, TextNode, TextType
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_basic_split(self):
@@ -223,6 +223,28 @@ class TestSplitNodesDelimiter(unittest.TestCase):
             text_to_textnodes(text)
         self.assertTrue("Closing delimiter not found" in str(context.exception))
 
+    def test_text_to_textnodes_code_not_resplit(self):
+        text = "Use `a **b** _c_` here"
+        result = text_to_textnodes(text)
+        expected = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a **b** _c_", TextType.CODE),
+            TextNode(" here", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, result)
+
+    def test_text_to_textnodes_underscore_in_url(self):
+        text = "A [link](https://example.com/my_page) and ![img](/my_image.png) [not a link]"
+        result = text_to_textnodes(text)
+        expected = [
+            TextNode("A ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://example.com/my_page"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("img", TextType.IMAGE, "/my_image.png"),
+            TextNode(" [not a link]", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, result)
+
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = """
@@ -244,6 +266,32 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_scan_blocks_types_and_spans(self):
+        md = "# Title\n\n\n- a\n- b\n\n  1. one\n2. two\n\n> quote\nnot quote\n"
+        blocks = list(scan_blocks(md))
+        self.assertEqual(
+            [(block.type, block.text, block.start, block.end) for block in blocks],
+            [
+                (BlockType.HEADING, "# Title", 0, 1),
+                (BlockType.UNORDERED_LIST, "- a\n- b", 3, 5),
+                (BlockType.ORDERED_LIST, "1. one\n2. two", 6, 8),
+                (BlockType.PARAGRAPH, "> quote\nnot quote", 9, 11),
+            ],
+        )
+        self.assertEqual(blocks[1].lines, ["- a", "- b"])
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```python\ndef f():\n\n    return 1\n```\nAfter"
+        blocks = list(scan_blocks(md))
+        self.assertEqual([block.type for block in blocks], [BlockType.PARAGRAPH, BlockType.CODE, BlockType.PARAGRAPH])
+        self.assertEqual(blocks[1].lines, ["```python", "def f():", "", "    return 1", "```"])
+        self.assertEqual((blocks[1].start, blocks[1].end), (2, 7))
+
+    def test_unclosed_fence_runs_to_end(self):
+        blocks = list(scan_blocks("```\ncode\n\nmore\n"))
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0].text, "```\ncode\n\nmore")
+
 class TestExtractTitle(unittest.TestCase):
     def test_basic_title(self):
         markdown = "# Hello"
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import LeafNode, ParentNode  
@@ -16,6 +17,70 @@ class TestParentNode(unittest.TestCase):
             parent_node.to_html(),
             "<div><span><b>grandchild</b></span></div>",
         )
+
+
+    def test_iter_html_fragments(self):
+        parent_node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<p>", "<b>", "bold", "</b>", " text", "</p>"],
+        )
+
+    def test_write_html(self):
+        parent_node = ParentNode("div", [ParentNode("span", [LeafNode("a", "x", {"href": "/"})])])
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(fp.getvalue(), parent_node.to_html())
+
+    def test_to_html_without_children_raises(self):
+        parent_node = ParentNode("div", [])
+        with self.assertRaises(ValueError):
+            parent_node.to_html()
+
+
+    def test_trusted_skips_constructor_checks(self):
+        node = ParentNode.trusted("div", [LeafNode("b", "x")])
+        self.assertEqual(node.to_html(), "<div><b>x</b></div>")
+        with self.assertRaises(ValueError):
+            ParentNode("div", ["not a node"])
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_hand_built_tree_checked_on_render(self):
+        parent_node = ParentNode("div", [LeafNode("b", "x")])
+        parent_node.children.append("not a node")
+        with self.assertRaises(ValueError):
+            parent_node.to_html()
+
+    def test_validate_marks_subtree_trusted(self):
+        child_node = ParentNode("span", [LeafNode("b", "x")])
+        parent_node = ParentNode("div", [child_node]).validate()
+        self.assertTrue(parent_node.is_trusted)
+        self.assertTrue(child_node.is_trusted)
+        self.assertEqual(parent_node.to_html(), "<div><span><b>x</b></span></div>")
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("span", [])]).validate()
+
+    def test_minified_output(self):
+        parent_node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "a   lot\n of"), LeafNode("a", "space", {"href": "/x", "title": "a b"})]),
+            ParentNode("ul", [LeafNode("li", "one"), ParentNode("li", [LeafNode("b", "two")])]),
+            LeafNode("img", "", {"src": "/a.png", "alt": ""}),
+        ])
+        self.assertEqual(
+            parent_node.to_html(minify=True),
+            '<div><p>a lot of<a href=/x title="a b">space</a></p><ul><li>one<li><b>two</b></ul><img src=/a.png alt=""></div>',
+        )
+        fp = io.StringIO()
+        parent_node.write_html(fp, minify=True)
+        self.assertEqual(fp.getvalue(), parent_node.to_html(minify=True))
+
+    def test_minified_output_keeps_unicode_spaces(self):
+        node = ParentNode("p", [LeafNode(None, "10\u00a0km \n and\u2003more")])
+        self.assertEqual(node.to_html(minify=True), "<p>10\u00a0km and\u2003more</p>")
+
+    def test_minified_output_keeps_preformatted_content(self):
+        node = ParentNode("div", [ParentNode("pre", [ParentNode("code", [LeafNode(None, "a  =  1\n  b\n")])])])
+        self.assertEqual(node.to_html(minify=True), "<div><pre><code>a  =  1\n  b\n</code></pre></div>")
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
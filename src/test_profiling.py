@@ -0,0 +1,44 @@
+import json
+import os
+import unittest
+from test_support import TempDirTestCase
+from htmlnode import LeafNode, ParentNode
+from main import generate_page
+from profiling import STAGES, BuildProfile, PageProfile, count_nodes
+
+class TestProfiling(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = self.write("page.md", "# Title\n\nSome **bold** text\n\n- a\n- b")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+    def test_profiled_page_matches_normal_page(self):
+        plain = os.path.join(self.root, "plain.html")
+        profiled = os.path.join(self.root, "profiled.html")
+        generate_page(self.src, self.template, plain)
+        profile = PageProfile(self.src)
+        generate_page(self.src, self.template, profiled, profile=profile)
+        self.assertEqual(self.read(plain), self.read(profiled))
+        self.assertEqual(set(profile.stages), set(STAGES))
+        self.assertGreater(profile.stages["inline"], 0)
+        self.assertEqual(profile.text_nodes, 6)
+        self.assertEqual(profile.html_nodes, 12)
+
+    def test_report(self):
+        build = BuildProfile()
+        for name, seconds in [("a", 0.1), ("b", 0.3), ("c", 0.2)]:
+            page = PageProfile(name)
+            page.add("read", seconds)
+            build.add(page)
+        path = os.path.join(self.root, "profile.json")
+        build.write(path, top=2)
+        report = json.loads(self.read(path))
+        self.assertEqual([page["path"] for page in report["slowest"]], ["b", "c"])
+        self.assertAlmostEqual(report["stages"]["read"], 0.6)
+
+    def test_count_nodes(self):
+        tree = ParentNode("div", [ParentNode("p", [LeafNode(None, "x")]), LeafNode("b", "y")])
+        self.assertEqual(count_nodes(tree), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from htmlnode import markdown_to_html_node, set_render_cache
+from render_cache import RenderCache
+from urls import UrlResolver
+
+class TestRenderCache(unittest.TestCase):
+    def tearDown(self):
+        set_render_cache(None)
+
+    def test_lru_eviction(self):
+        cache = RenderCache(maxsize=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_repeated_blocks_hit_cache(self):
+        cache = RenderCache()
+        set_render_cache(cache)
+        md = "Shared **footer**\n\n```\ncode\n```\n\nShared **footer**"
+        html = markdown_to_html_node(md).to_html()
+        set_render_cache(None)
+        self.assertEqual(html, markdown_to_html_node(md).to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_minify_cache_holds_minified_fragments(self):
+        md = "- a   b\n- c\n\n```\nx  =  1\n```"
+        set_render_cache(RenderCache(minify=True))
+        html = markdown_to_html_node(md).to_html(minify=True)
+        self.assertEqual(html, "<div><ul><li>a b<li>c</ul><pre><code>x  =  1\n</code></pre></div>")
+        set_render_cache(None)
+        self.assertEqual(markdown_to_html_node(md).to_html(minify=True), html)
+
+    def test_basepath_is_part_of_key(self):
+        set_render_cache(RenderCache())
+        md = "[home](/)"
+        self.assertIn('href="/"', markdown_to_html_node(md, UrlResolver("/")).to_html())
+        self.assertIn('href="/site/"', markdown_to_html_node(md, UrlResolver("/site/")).to_html())
+
+    def test_persisted_between_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = RenderCache()
+            set_render_cache(cache)
+            markdown_to_html_node("Some _text_")
+            cache.save(path)
+            loaded = RenderCache.load(path)
+            set_render_cache(loaded)
+            markdown_to_html_node("Some _text_")
+            self.assertEqual(loaded.hits, 1)
+
+if __name__ == "__main__":
+    unittest.main()
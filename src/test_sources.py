@@ -0,0 +1,59 @@
+import os
+import unittest
+from test_support import TempDirTestCase
+from htmlnode import markdown_lines_to_document, markdown_to_document
+from md_to_textnode import extract_title
+from sources import MarkdownSource
+
+class TestMarkdownSource(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "page.md")
+
+    def open(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return MarkdownSource(self.path)
+
+    def test_title_and_text(self):
+        data = "Intro\n\n## Sub\n#\n  #   Café Title  \n\n  #   Café Later  \n"
+        with self.open(data.encode()) as source:
+            # Lines continuing the h2 block are not the title
+            self.assertEqual(source.title(), "Café Later")
+            self.assertEqual(source.title(), markdown_to_document(data).title)
+            self.assertEqual(source.text(), data)
+            self.assertEqual(list(source.lines()), data.split("\n")[:-1])
+        self.assertEqual(extract_title(data), "Café Title")
+
+    def test_line_endings_normalized(self):
+        with self.open(b"# Title\r\n\r\nOne\rTwo\r\n") as source:
+            self.assertEqual(source.title(), "Title")
+            self.assertEqual(source.text(), "# Title\n\nOne\nTwo\n")
+            self.assertEqual(list(source.lines()), ["# Title", "", "One", "Two"])
+
+    def test_lines_render_like_text(self):
+        data = "# Title\r\n\n- a\n- b\n\n```\ncode\n```\n\n> quote\n"
+        with self.open(data.encode()) as source:
+            expected = markdown_to_document(source.text())
+            document = markdown_lines_to_document(source.lines())
+        self.assertEqual(document.node.to_html(), expected.node.to_html())
+        self.assertEqual(document.title, expected.title)
+
+    def test_front_matter(self):
+        data = "---\n# a YAML comment\ntags: [a]\n---\n# Title\n"
+        with self.open(data.encode()) as source:
+            self.assertEqual(source.metadata, {"tags": ["a"]})
+            self.assertEqual(source.title(), "Title")
+            self.assertEqual(source.text(), "\n\n\n\n# Title\n")
+            self.assertEqual(list(source.lines()), ["", "", "", "", "# Title"])
+
+    def test_empty_file(self):
+        with self.open(b"") as source:
+            self.assertEqual(source.text(), "")
+            self.assertEqual(list(source.lines()), [])
+            with self.assertRaises(ValueError):
+                source.title()
+
+
+if __name__ == "__main__":
+    unittest.main()
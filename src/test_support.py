@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    Test-only base class for tests that work on files: each test gets a
+    fresh temporary directory, self.root, removed afterwards. Relative paths
+    given to write() and read() are taken from self.root.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime=None):
+        """
+        Writes text to path, creating missing directories, and sets its mtime
+        when given. Returns the full path.
+        """
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as f:
+            return f.read()
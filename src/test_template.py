@@ -0,0 +1,132 @@
+import io
+import os
+import unittest
+from test_support import TempDirTestCase
+from template import Layouts, Template, page_values
+from urls import UrlResolver
+from htmlnode import ParentNode, LeafNode, markdown_to_html_node
+
+class TestTemplate(unittest.TestCase):
+    def test_render_slots(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>x</p>"),
+            "<title>Hi</title><body><p>x</p></body>",
+        )
+
+    def test_missing_slot_keeps_placeholder(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render(Title="Hi"), "Hi {{ Footer }}")
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        fp = io.StringIO()
+        template.write(fp, Title="Hi", Content=ParentNode("p", [LeafNode("b", "x")]))
+        self.assertEqual(fp.getvalue(), "<title>Hi</title><p><b>x</b></p>")
+
+    def test_basepath_applied_at_compile_time(self):
+        template = Template('<link href="/index.css" /><img src="/a.png" />{{ Content }}', UrlResolver("/site/"))
+        self.assertEqual(
+            template.render(Content='<a href="/not-rewritten">'),
+            '<link href="/site/index.css" /><img src="/site/a.png" /><a href="/not-rewritten">',
+        )
+
+    def test_minify_keeps_unicode_spaces(self):
+        template = Template("<p>\u00a0{{ Content }}\u00a0km</p>\n<div>\u2003</div>", UrlResolver("/"), minify=True)
+        self.assertEqual(template.render(Content="10"), "<p>\u00a010\u00a0km</p><div>\u2003</div>")
+
+    def test_minify(self):
+        source = (
+            '<!doctype html>\n<html>\n  <head>\n    <meta charset="utf-8" />\n'
+            '    <title>{{ Title }}</title>\n  </head>\n  <body>\n    <p>Hello   <b>there</b></p>\n'
+            '    <pre>  keep\n  this</pre>\n    <article>{{ Content }}</article>\n  </body>\n</html>'
+        )
+        template = Template(source, UrlResolver("/"), minify=True)
+        content = ParentNode("ul", [LeafNode("li", "a  b"), LeafNode("li", "c")])
+        fp = io.StringIO()
+        template.write(fp, Title="Hi", Content=content)
+        self.assertEqual(
+            fp.getvalue(),
+            "<!doctype html><html><head><meta charset=utf-8><title>Hi</title></head><body>"
+            "<p>Hello <b>there</b></p><pre>  keep\n  this</pre><article><ul><li>a b<li>c</ul></article></body></html>",
+        )
+
+class TestUrlResolver(unittest.TestCase):
+    def test_resolve(self):
+        urls = UrlResolver("/site/")
+        self.assertEqual(urls("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(urls("https://boot.dev"), "https://boot.dev")
+        self.assertEqual(urls("//cdn.example.com/x.js"), "//cdn.example.com/x.js")
+        self.assertEqual(UrlResolver("/site")("/"), "/site/")
+
+    def test_fingerprinted_assets(self):
+        urls = UrlResolver("/site/", {"/index.css": "/index.abc.css"})
+        self.assertEqual(urls("/index.css"), "/site/index.abc.css")
+        self.assertEqual(urls("/index.css?v=2#top"), "/site/index.abc.css?v=2#top")
+        self.assertEqual(urls("/other.css"), "/site/other.css")
+        self.assertNotEqual(urls.cache_key, UrlResolver("/site/").cache_key)
+
+    def test_markdown_links_and_images_resolved(self):
+        md = "[home](/) and ![pic](/images/a.png) and [ext](https://boot.dev)"
+        html = markdown_to_html_node(md, UrlResolver("/site/")).to_html()
+        self.assertEqual(
+            html,
+            '<div><p><a href="/site/">home</a> and <img src="/site/images/a.png" alt="pic"></img> and <a href="https://boot.dev">ext</a></p></div>',
+        )
+
+class TestLayouts(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.default = os.path.join(self.root, "template.html")
+        self.layouts_dir = os.path.join(self.root, "layouts")
+        self.write(self.default, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.layouts_dir, "blog.html"), "{{> nav }}<article>{{ Content }}</article>")
+        self.write(os.path.join(self.layouts_dir, "post.html"), "{{> nav }}<h1>{{ Title }}</h1> {{ Date }}")
+        self.write(os.path.join(self.layouts_dir, "partials", "nav.html"), '<nav><a href="/">{{ Title }}</a>{{>links}}</nav>')
+        self.write(os.path.join(self.layouts_dir, "partials", "links.html"), '<a href="/blog">Blog</a>')
+        self.layouts = Layouts(self.default, self.layouts_dir, UrlResolver("/site/"))
+
+    def test_select(self):
+        self.assertIsNone(self.layouts.select("index.md"))
+        self.assertIsNone(self.layouts.select(os.path.join("contact", "index.md")))
+        self.assertEqual(self.layouts.select(os.path.join("blog", "tom", "index.md")), "blog")
+        self.assertEqual(self.layouts.select("index.md", {"layout": "post"}), "post")
+        with self.assertRaises(ValueError):
+            self.layouts.select("index.md", {"layout": "missing"})
+        with self.assertRaises(ValueError):
+            Layouts(self.default).select("index.md", {"layout": "post"})
+
+    def test_partials_are_inlined_and_resolved(self):
+        template = self.layouts.get("blog")
+        self.assertEqual(
+            template.render(Title="Hi", Content="x"),
+            '<nav><a href="/site/">Hi</a><a href="/site/blog">Blog</a></nav><article>x</article>',
+        )
+        partials = os.path.join(self.layouts_dir, "partials")
+        self.assertEqual(template.files, [os.path.join(self.layouts_dir, "blog.html"), os.path.join(partials, "nav.html"),
+                                          os.path.join(partials, "links.html")])
+        self.assertEqual(self.layouts.get().files, [self.default])
+
+    def test_compiled_once_and_cached_by_file_hash(self):
+        template = self.layouts.get("blog")
+        self.assertIs(self.layouts.get("blog"), template)
+        self.assertIs(Layouts(self.default, self.layouts_dir, UrlResolver("/site/")).get("blog"), template)
+        self.assertIsNot(Layouts(self.default, self.layouts_dir, UrlResolver("/")).get("blog"), template)
+        self.write(os.path.join(self.layouts_dir, "partials", "links.html"), "")
+        self.assertIsNot(Layouts(self.default, self.layouts_dir, UrlResolver("/site/")).get("blog"), template)
+
+    def test_recursive_partial(self):
+        self.write(os.path.join(self.layouts_dir, "partials", "links.html"), "{{> nav }}")
+        with self.assertRaises(ValueError):
+            self.layouts.get("blog")
+
+    def test_page_values(self):
+        template = self.layouts.get("post")
+        values = page_values(template, "Hi", "x", {"date": 1704153600.0, "tags": ["a", "b"], "title": "ignored"})
+        self.assertEqual(values, {"Title": "Hi", "Content": "x", "Date": "2024-01-02", "Tags": "a, b"})
+        self.assertEqual(template.render(**page_values(template, "Hi", "x")), '<nav><a href="/site/">Hi</a>'
+                         '<a href="/site/blog">Blog</a></nav><h1>Hi</h1> ')
+
+if __name__ == "__main__":
+    unittest.main()
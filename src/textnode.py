@@ -17,9 +17,9 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text, text_type, url=None):
-        super().__init__()
         self.text = text
         self.text_type = text_type
         self.url = url
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import re
+
+URL_SUFFIX_RE = re.compile(r"([^?#]*)(.*)", re.S)
+
+class UrlResolver():
+    """
+    Maps the site-root URLs used in content and templates ("/images/x.png")
+    to the path the site is actually served from.
+
+    An optional assets map ({"/index.css": "/index.1a2b3c4d5e.css"}) swaps
+    static asset URLs for their fingerprinted names before the basepath is
+    applied.
+
+    An optional images map from process_images supplies the width, height
+    and srcset emitted on image nodes.
+    """
+
+    def __init__(self, basepath="/", assets=None, images=None):
+        if not basepath.endswith("/"):
+            basepath += "/"
+        self.basepath = basepath
+        self.assets = assets or {}
+        self.images = images
+        # Identifies everything resolution depends on, for caches and manifests
+        self.cache_key = basepath
+        if self.assets or self.images is not None:
+            state = json.dumps([self.assets, self.images], sort_keys=True)
+            self.cache_key += "#" + hashlib.sha256(state.encode()).hexdigest()[:16]
+
+    def __call__(self, url):
+        # Protocol-relative URLs ("//cdn.example.com") are external
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        if self.assets:
+            url = self._fingerprinted(url)
+        return self.basepath + url[1:]
+
+    def _fingerprinted(self, url):
+        # Keep any query string or fragment after the asset path
+        path, suffix = URL_SUFFIX_RE.match(url).groups()
+        fingerprinted = self.assets.get(path)
+        if fingerprinted is None:
+            return url
+        return fingerprinted + suffix
+
+    def image_attributes(self, url):
+        """
+        Returns the extra attributes for an <img> pointing at url: lazy
+        loading, plus dimensions and a srcset for processed images. When
+        variants exist, src is replaced by the full-width one so browsers
+        without srcset support never fetch the unprocessed original.
+        """
+        if self.images is None:
+            return {}
+        attributes = {}
+        image = self.images.get(URL_SUFFIX_RE.match(url).group(1))
+        if image is not None:
+            attributes["width"] = image["width"]
+            attributes["height"] = image["height"]
+            if image["variants"]:
+                # Variants are sorted by width, the last one is full size
+                attributes["src"] = self(image["variants"][-1][0])
+                attributes["srcset"] = ", ".join(f"{self(variant)} {width}w" for variant, width in image["variants"])
+        attributes["loading"] = "lazy"
+        return attributes
+
+    def __repr__(self):
+        return f"UrlResolver(basepath={self.basepath}, assets={len(self.assets)})"